@@ -0,0 +1,35 @@
+/**
+ * Replaces the service references in the host graphs of a /simulate response with the
+ * services they refer to. Each service version and vulnerability is only sent once, so
+ * services of the same version share their vulnerability list.
+ * @param {object} data the /simulate response
+ * @returns {object} the network with the services resolved
+ */
+
+export default function resolveServices(data) {
+  const { network, service_versions, vulnerabilities } = data;
+  if (!service_versions) return network;
+
+  const versionVulnerabilities = {};
+  for (const [versionId, version] of Object.entries(service_versions)) {
+    versionVulnerabilities[versionId] = version.vulnerabilities.map(
+      (vulnId) => vulnerabilities[vulnId]
+    );
+  }
+
+  for (const node of network.nodes) {
+    for (const serviceNode of node.host.graph.nodes) {
+      const service = serviceNode.service;
+      if (!service || service.serviceVersion === undefined) continue;
+      const version = service_versions[service.serviceVersion];
+      serviceNode.service = {
+        name: version.name,
+        version: version.version,
+        vulnerabilities: versionVulnerabilities[service.serviceVersion],
+        exploitValue: service.exploitValue,
+        id: service.id,
+      };
+    }
+  }
+  return network;
+}
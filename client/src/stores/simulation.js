@@ -1,5 +1,6 @@
 import { defineStore } from "pinia";
 import axios from "axios";
+import resolveServices from "../helpers/resolveServices";
 const BACKEND_URL = "https://mtd-sim-api-u5ffcbdh3q-ts.a.run.app/";
 
 export const useSimulationStore = defineStore("simulation", {
@@ -52,8 +53,8 @@ export const useSimulationStore = defineStore("simulation", {
       }
 
       const { data } = await axios.post(`${BACKEND_URL}/simulate`, reqBody);
-      const { network, attack_record, mtd_record } = data;
-      this.network = network;
+      const { attack_record, mtd_record } = data;
+      this.network = resolveServices(data);
       this.attackRecord = attack_record;
       this.mtdRecord = mtd_record;
     },
@@ -1,14 +1,30 @@
+import os
 from flask import Flask, request
 from flask_cors import CORS
-from api.services import run_simulation
+from api.services import (
+    run_simulation,
+    stream_simulation,
+    compress_chunks,
+    PAYLOAD_SECTIONS,
+    DETAIL_LEVELS,
+    MEDIA_TYPES,
+    CONTENT_ENCODINGS,
+    JobManager,
+    QueueFullError,
+    ShutDownError,
+    ResultCache,
+    simulation_cache_key,
+)
 from mtdnetwork.mtd.completetopologyshuffle import CompleteTopologyShuffle
 from mtdnetwork.mtd.ipshuffle import IPShuffle
 from mtdnetwork.mtd.osdiversity import OSDiversity
 from mtdnetwork.mtd.servicediversity import ServiceDiversity
-import networkx as nx
 
 app = Flask(__name__)
 CORS(app)
+job_manager = JobManager()
+# seeded results are cached, set SIMULATION_CACHE_DIR to keep them across restarts
+result_cache = ResultCache(directory=os.environ.get("SIMULATION_CACHE_DIR"))
 
 
 strategy_mapping = {
@@ -29,71 +45,213 @@ def strategies():
     return list(strategy_mapping.keys()), 200
 
 
-@app.route("/simulate", methods=["POST"])
-def simulate():
-    scheme = request.json.get("scheme")
-    mtd_interval = request.json.get("mtdInterval")
-    finish_time = request.json.get("finishTime")
-    total_nodes = request.json.get("totalNodes")
-    strategies = request.json.get("strategies")
-    total_endpoints = request.json.get("totalEndpoints")
-    total_subnets = request.json.get("totalSubnets")
-    total_database = request.json.get("totalDatabase")
-    total_layers = request.json.get("totalLayers")
-    target_layer = request.json.get("targetLayer")
-    seed = request.json.get("seed")
+def get_simulation_params(body):
+    """
+    Validates a simulation request body
+
+    Returns:
+        a tuple of the keyword arguments for run_simulation and an error response,
+        one of which is None
+    """
+    scheme = body.get("scheme")
+    mtd_interval = body.get("mtdInterval")
+    finish_time = body.get("finishTime")
+    total_nodes = body.get("totalNodes")
+    strategies = body.get("strategies")
+    total_endpoints = body.get("totalEndpoints")
+    total_subnets = body.get("totalSubnets")
+    total_database = body.get("totalDatabase")
+    total_layers = body.get("totalLayers")
+    target_layer = body.get("targetLayer")
+    seed = body.get("seed")
 
     custom_strategies = None
 
     if not all([mtd_interval, finish_time, total_nodes]):
-        return {"Error": "mtd_interval, finish_time, total_nodes must be provided"}, 400
+        return None, (
+            {"Error": "mtd_interval, finish_time, total_nodes must be provided"},
+            400,
+        )
 
     if scheme is not None and scheme not in available_schemes:
-        return {"error": f"scheme {scheme} does not exist"}, 400
+        return None, ({"error": f"scheme {scheme} does not exist"}, 400)
 
     # NOTE: custom strategies are ignored if scheme is in random or None
     if scheme is not None and scheme != "random":
         if strategies is None:
-            return {"error": "MTD strategy not specified"}, 400
+            return None, ({"error": "MTD strategy not specified"}, 400)
         custom_strategies = []
         for strategy in strategies:
             if strategy not in strategy_mapping.keys():
-                return {"error": f"Strategy '{strategy}' does not exist"}, 400
+                return None, ({"error": f"Strategy '{strategy}' does not exist"}, 400)
             custom_strategies.append(strategy_mapping.get(strategy))
 
     if scheme == "single" and len(custom_strategies) > 1:
-        return {"error": "More than one MTD strategy specified for single scheme"}, 400
-
-    result = run_simulation(
-        finish_time=finish_time,
-        mtd_interval=mtd_interval,
-        scheme=scheme,
-        total_nodes=total_nodes,
-        seed=seed,
-        total_endpoints=total_endpoints,
-        total_subnets=total_subnets,
-        total_layers=total_layers,
-        target_layer=target_layer,
-        total_database=total_database,
-        custom_strategies=custom_strategies,
+        return None, (
+            {"error": "More than one MTD strategy specified for single scheme"},
+            400,
+        )
+
+    params = {
+        "finish_time": finish_time,
+        "mtd_interval": mtd_interval,
+        "scheme": scheme,
+        "total_nodes": total_nodes,
+        "seed": seed,
+        "total_endpoints": total_endpoints,
+        "total_subnets": total_subnets,
+        "total_layers": total_layers,
+        "target_layer": target_layer,
+        "total_database": total_database,
+        "custom_strategies": custom_strategies,
+    }
+    return params, None
+
+
+def get_payload_params(body):
+    """
+    Validates the payload options of a simulation request body, the payload sections
+    to include and the detail level of the network
+
+    Returns:
+        a tuple of the keyword arguments for stream_simulation and an error response,
+        one of which is None
+    """
+    include = body.get("include")
+    detail = body.get("detail", "full")
+
+    if include is not None:
+        if not isinstance(include, list):
+            return None, ({"error": "include must be a list of sections"}, 400)
+        for section in include:
+            if section not in PAYLOAD_SECTIONS:
+                return None, ({"error": f"Section '{section}' does not exist"}, 400)
+        # in payload order so that the same sections give the same cache key
+        include = [section for section in PAYLOAD_SECTIONS if section in include]
+
+    if detail not in DETAIL_LEVELS:
+        return None, ({"error": f"detail {detail} does not exist"}, 400)
+
+    return {"include": include, "detail": detail}, None
+
+
+def get_media_type():
+    """
+    Returns the media type of the payload the client accepts, JSON unless the client
+    prefers another of the media types
+    """
+    return request.accept_mimetypes.best_match(MEDIA_TYPES, default=MEDIA_TYPES[0])
+
+
+def payload_response(chunks, media_type):
+    """
+    Returns a response of the payload chunks, compressed with the content encoding
+    the client accepts if there is one
+    """
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    content_encoding = request.accept_encodings.best_match(CONTENT_ENCODINGS)
+    if content_encoding is not None:
+        chunks = compress_chunks(chunks, content_encoding)
+        headers["Content-Encoding"] = content_encoding
+    return app.response_class(chunks, mimetype=media_type, headers=headers)
+
+
+@app.route("/simulate", methods=["POST"])
+def simulate():
+    params, error = get_simulation_params(request.json)
+    if error is not None:
+        return error
+    payload_params, error = get_payload_params(request.json)
+    if error is not None:
+        return error
+    payload_params["media_type"] = get_media_type()
+
+    # unseeded simulations are not repeatable so only seeded results are cached
+    cache_key = (
+        simulation_cache_key(params, payload_params)
+        if params["seed"] is not None
+        else None
     )
+    if cache_key is not None:
+        payload = result_cache.get(cache_key)
+        if payload is not None:
+            return payload_response([payload], payload_params["media_type"])
+
+    result = run_simulation(**params)
+    # the payload is encoded as it is written to the response, an error while it is
+    # written ends the chunked response without its terminating chunk and is not cached
+    chunks = stream_simulation(result, **payload_params)
+    if cache_key is not None:
+        chunks = result_cache.put_chunks(cache_key, chunks)
+
+    return payload_response(chunks, payload_params["media_type"])
 
-    data = {}
-    net_graph = nx.node_link_data(result._network.graph)
-    for node in net_graph["nodes"]:
-        node["host"] = node["host"].to_json()
 
-    data["network"] = net_graph
-    data["mtd_record"] = result._mtd_record.to_dict()
-    data["attack_record"] = result._attack_record.to_dict()
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    params, error = get_simulation_params(request.json)
+    if error is not None:
+        return error
+    payload_params, error = get_payload_params(request.json)
+    if error is not None:
+        return error
 
-    data[
-        "compromise_checkpoint_metrics"
-    ] = result.evaluation_result_by_compromise_checkpoint()
+    try:
+        job_id = job_manager.submit(params, payload_params)
+    except QueueFullError:
+        return {"error": "Too many simulation jobs queued, try again later"}, 503
 
+    return {"id": job_id, "status": job_manager.get_status(job_id)}, 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    if not job_manager.has_job(job_id):
+        return {"error": f"job {job_id} does not exist"}, 404
+
+    data = {
+        "id": job_id,
+        "status": job_manager.get_status(job_id),
+        "progress": job_manager.get_progress(job_id),
+    }
+    error = job_manager.get_error(job_id)
+    if error is not None:
+        data["error"] = error
     return data, 200
 
 
+@app.route("/jobs/<job_id>/result", methods=["GET"])
+def job_result(job_id):
+    if not job_manager.has_job(job_id):
+        return {"error": f"job {job_id} does not exist"}, 404
+
+    status = job_manager.get_status(job_id)
+    if status != "finished":
+        return {"error": f"job {job_id} is {status}"}, 409
+
+    media_type = get_media_type()
+    return payload_response([job_manager.get_result(job_id, media_type)], media_type)
+
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id):
+    if not job_manager.has_job(job_id):
+        return {"error": f"job {job_id} does not exist"}, 404
+
+    if not job_manager.cancel(job_id):
+        status = job_manager.get_status(job_id)
+        error = f"job {job_id} is {status}, there is nothing to cancel"
+        if status in ["queued", "running"]:
+            error = f"job {job_id} has no finish time and cannot be cancelled while it is running"
+        return {"error": error, "status": status}, 409
+    return {"id": job_id, "status": job_manager.get_status(job_id)}, 200
+
+
+@app.errorhandler(ShutDownError)
+def job_manager_shut_down(error):
+    return {"error": "The simulation job service has shut down"}, 503
+
+
 @app.route("/schemes", methods=["GET"])
 def schemes():
     return available_schemes, 200
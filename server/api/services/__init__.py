@@ -1 +1,12 @@
 from .simulation import run_simulation
+from .encoding import (
+    stream_simulation,
+    transcode,
+    compress_chunks,
+    PAYLOAD_SECTIONS,
+    DETAIL_LEVELS,
+    MEDIA_TYPES,
+    CONTENT_ENCODINGS,
+)
+from .jobs import JobManager, QueueFullError, ShutDownError
+from .cache import ResultCache, simulation_cache_key
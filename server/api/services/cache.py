@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from .encoding import WRITERS, JSONWriter
+
+# bump when a change to the simulation or its payload changes the result for the same parameters
+CACHE_VERSION = 2
+# size of the cached payloads kept in memory before the least recently used are evicted
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# size of a streamed payload above which it is not cached
+MAX_PAYLOAD_BYTES = 64 * 1024 * 1024
+# size of a streamed payload kept in memory while it is written, the rest is spooled to disk
+SPOOL_BYTES = 1024 * 1024
+
+
+def simulation_cache_key(simulation_params, payload_params=None):
+    """
+    Returns a canonical hash of the run_simulation keyword arguments and the
+    stream_simulation keyword arguments the payload is encoded with, followed by
+    the file extension of the media type of the payload
+    """
+    params = dict(simulation_params)
+    media_type = JSONWriter.media_type
+    if payload_params is not None:
+        params["payload"] = payload_params
+        media_type = payload_params.get("media_type", media_type)
+    if params.get("custom_strategies") is not None:
+        params["custom_strategies"] = [
+            strategy.__name__ for strategy in params["custom_strategies"]
+        ]
+    params["cache_version"] = CACHE_VERSION
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return digest + WRITERS[media_type].extension
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_bytes=MAX_CACHE_BYTES,
+        directory=None,
+        max_payload_bytes=MAX_PAYLOAD_BYTES,
+    ):
+        """
+        Content-addressed cache of encoded simulation results.
+
+        Parameters:
+            max_bytes:
+                the total size of the payloads kept in memory, the least recently used
+                payloads are evicted first
+            directory:
+                the directory of the on-disk tier that survives restarts, None to disable it
+            max_payload_bytes:
+                the size of a streamed payload above which it is not cached
+        """
+        self.max_bytes = max_bytes
+        self.max_payload_bytes = max_payload_bytes
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """
+        Returns:
+            the cached payload, None if the key is not cached
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.directory is None or not os.path.exists(self._get_path(key)):
+            return None
+        with open(self._get_path(key), "rb") as f:
+            payload = f.read()
+        self._put_memory(key, payload)
+        return payload
+
+    def put(self, key, payload):
+        self._put_memory(key, payload)
+        if self.directory is not None:
+            # write to a temporary file first so a partially written payload is never read
+            tmp_path = self._get_path(key) + ".tmp." + str(threading.get_ident())
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._get_path(key))
+
+    def put_chunks(self, key, chunks):
+        """
+        Passes the chunks of a payload through and caches the payload once all of
+        them have been read, nothing is cached if the chunks are not read to the end
+        """
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as payload:
+            for chunk in chunks:
+                yield chunk
+                # the copy is dropped once the payload is too large to cache
+                if payload.closed:
+                    continue
+                if payload.tell() + len(chunk) > self.max_payload_bytes:
+                    payload.close()
+                    continue
+                payload.write(chunk)
+            if not payload.closed:
+                payload.seek(0)
+                self.put(key, payload.read())
+
+    def _put_memory(self, key, payload):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= len(self._entries.pop(key))
+            self._entries[key] = payload
+            self._total_bytes += len(payload)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def get_total_bytes(self):
+        with self._lock:
+            return self._total_bytes
+
+    def __contains__(self, key):
+        """
+        Returns:
+            True if the key is cached in memory
+        """
+        with self._lock:
+            return key in self._entries
@@ -0,0 +1,284 @@
+import zlib
+import numpy as np
+import orjson
+from mtdnetwork.component.services import ServiceTable
+
+# MessagePack and zstd are optional, they are only offered when they are installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# size the encoded parts of a response are joined into before they are written
+CHUNK_SIZE = 64 * 1024
+# the top level elements of the payload that can be requested
+PAYLOAD_SECTIONS = [
+    "network",
+    "mtd_record",
+    "attack_record",
+    "compromise_checkpoint_metrics",
+]
+# summary: the topology only, hosts: also the host details, full: also the host graphs
+DETAIL_LEVELS = ["summary", "hosts", "full"]
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj):
+    """
+    Encodes an object as JSON bytes
+    """
+    return orjson.dumps(obj, option=JSON_OPTIONS)
+
+
+class JSONWriter:
+    media_type = "application/json"
+    extension = ".json"
+
+    def value(self, obj):
+        return dumps(obj)
+
+    def start_map(self, size):
+        return b"{"
+
+    def key(self, key, index):
+        return (b"," if index > 0 else b"") + dumps(key) + b":"
+
+    def end_map(self):
+        return b"}"
+
+    def start_list(self, size):
+        return b"["
+
+    def item(self, index):
+        return b"," if index > 0 else b""
+
+    def end_list(self):
+        return b"]"
+
+
+def _to_builtin(obj):
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} cannot be encoded")
+
+
+class MessagePackWriter:
+    media_type = "application/msgpack"
+    extension = ".msgpack"
+
+    def __init__(self):
+        """
+        Writes MessagePack, the sizes of maps and lists are written up front
+        """
+        self._packer = msgpack.Packer(default=_to_builtin)
+
+    def value(self, obj):
+        return self._packer.pack(obj)
+
+    def start_map(self, size):
+        return self._packer.pack_map_header(size)
+
+    def key(self, key, index):
+        return self._packer.pack(key)
+
+    def end_map(self):
+        return b""
+
+    def start_list(self, size):
+        return self._packer.pack_array_header(size)
+
+    def item(self, index):
+        return b""
+
+    def end_list(self):
+        return b""
+
+
+# the media types the payload can be encoded in, the first is the default
+WRITERS = {JSONWriter.media_type: JSONWriter}
+if msgpack is not None:
+    WRITERS[MessagePackWriter.media_type] = MessagePackWriter
+MEDIA_TYPES = list(WRITERS)
+# the content encodings the payload can be compressed with, from the most preferred
+CONTENT_ENCODINGS = (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def _encode_value(writer, obj):
+    yield writer.value(obj)
+
+
+def _encode_map(writer, items):
+    """
+    Encodes a list of pairs of keys and iterators of the encoded values, each value is
+    only encoded when it is reached
+    """
+    yield writer.start_map(len(items))
+    for i, (key, parts) in enumerate(items):
+        yield writer.key(key, i)
+        yield from parts
+    yield writer.end_map()
+
+
+def _encode_list(writer, items, size):
+    yield writer.start_list(size)
+    for i, item in enumerate(items):
+        yield writer.item(i) + writer.value(item)
+    yield writer.end_list()
+
+
+def _encode_node(node, attributes, detail, service_table):
+    data = {key: value for key, value in attributes.items() if key != "host"}
+    if detail != "summary":
+        data["host"] = attributes["host"].to_json(
+            service_table, with_graph=detail == "full"
+        )
+    data["id"] = node
+    return data
+
+
+def _encode_network(writer, graph, detail, service_table):
+    """
+    Encodes the graph in the networkx node-link format, one node and one link at a time.
+    The services of the hosts are added to the service table.
+    """
+    nodes = (
+        _encode_node(node, attributes, detail, service_table)
+        for node, attributes in graph.nodes(data=True)
+    )
+    links = (
+        {**attributes, "source": u, "target": v}
+        for u, v, attributes in graph.edges(data=True)
+    )
+    return _encode_map(
+        writer,
+        [
+            ("directed", _encode_value(writer, graph.is_directed())),
+            ("multigraph", _encode_value(writer, graph.is_multigraph())),
+            ("graph", _encode_value(writer, graph.graph)),
+            ("nodes", _encode_list(writer, nodes, graph.number_of_nodes())),
+            ("links", _encode_list(writer, links, graph.number_of_edges())),
+        ],
+    )
+
+
+def _encode_column(writer, index, column):
+    yield writer.value(dict(zip(index, column.tolist())))
+
+
+def _encode_record(writer, record):
+    """
+    Encodes a record dataframe in the DataFrame.to_dict() format, one column at a time
+    """
+    index = [str(i) for i in record.index]
+    return _encode_map(
+        writer,
+        [
+            (column, _encode_column(writer, index, record[column]))
+            for column in record.columns
+        ],
+    )
+
+
+def _join_chunks(parts, chunk_size=CHUNK_SIZE):
+    chunk = []
+    size = 0
+    for part in parts:
+        chunk.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def stream_simulation(
+    evaluation, include=None, detail="full", media_type=JSONWriter.media_type
+):
+    """
+    Encodes the evaluation of a simulation into the /simulate response payload
+
+    Parameters:
+        include:
+            the PAYLOAD_SECTIONS to encode, None for all of them. Sections that are
+            not included are never built
+        detail:
+            the DETAIL_LEVELS of the network
+        media_type:
+            one of MEDIA_TYPES
+
+    Returns:
+        an iterator of byte chunks, the network and the records are encoded as the
+        chunks are read so the whole payload is never held in memory. An error while
+        the chunks are read can only cut the payload off, the metrics are computed
+        before the first chunk so that they can fail the request instead
+    """
+    if include is None:
+        include = PAYLOAD_SECTIONS
+    writer = WRITERS[media_type]()
+    sections = []
+    if "network" in include:
+        service_table = ServiceTable()
+        sections.append(
+            (
+                "network",
+                _encode_network(
+                    writer, evaluation.get_network().graph, detail, service_table
+                ),
+            )
+        )
+        if detail == "full":
+            # every service version and vulnerability is only sent once, hosts refer to
+            # them by id. The tables are filled in while the network is encoded
+            service_versions = _encode_value(writer, service_table.service_versions)
+            vulnerabilities = _encode_value(writer, service_table.vulnerabilities)
+            sections.append(("service_versions", service_versions))
+            sections.append(("vulnerabilities", vulnerabilities))
+    if "mtd_record" in include:
+        sections.append(("mtd_record", _encode_record(writer, evaluation._mtd_record)))
+    if "attack_record" in include:
+        sections.append(
+            ("attack_record", _encode_record(writer, evaluation._attack_record))
+        )
+    if "compromise_checkpoint_metrics" in include:
+        # computed up front so that an error fails the request before anything is written
+        compromise_checkpoint_metrics = (
+            evaluation.evaluation_result_by_compromise_checkpoint()
+        )
+        sections.append(
+            (
+                "compromise_checkpoint_metrics",
+                _encode_value(writer, compromise_checkpoint_metrics),
+            )
+        )
+
+    return _join_chunks(_encode_map(writer, sections))
+
+
+def transcode(payload, media_type):
+    """
+    Re-encodes a JSON payload in another of the MEDIA_TYPES
+    """
+    if media_type == JSONWriter.media_type:
+        return payload
+    return WRITERS[media_type]().value(orjson.loads(payload))
+
+
+def compress_chunks(chunks, content_encoding):
+    """
+    Compresses a stream of chunks with one of the CONTENT_ENCODINGS
+    """
+    if content_encoding == "zstd":
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
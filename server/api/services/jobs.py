@@ -0,0 +1,234 @@
+import atexit
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from .simulation import run_simulation
+from .encoding import stream_simulation, transcode, JSONWriter
+
+# number of simulations that run at the same time
+MAX_WORKERS = 2
+# number of queued and running jobs accepted before new jobs are rejected
+MAX_QUEUE_DEPTH = 16
+# number of finished jobs kept for result retrieval
+MAX_FINISHED_JOBS = 64
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class ShutDownError(Exception):
+    pass
+
+
+def run_job(job_id, simulation_params, payload_params, progress, cancelled):
+    """
+    Runs a simulation job in a worker process and returns the encoded /simulate payload.
+    Progress is written to the shared progress dict, the job stops at the next
+    progress step once it is flagged in the shared cancelled dict.
+    """
+
+    def progress_callback(value):
+        if cancelled.get(job_id, False):
+            raise JobCancelled(job_id)
+        progress[job_id] = value
+
+    # a job is only reported as running once a worker has picked it up
+    progress_callback(0.0)
+    evaluation = run_simulation(
+        progress_callback=progress_callback, **simulation_params
+    )
+    return b"".join(stream_simulation(evaluation, **payload_params))
+
+
+class JobManager:
+    def __init__(
+        self,
+        max_workers=MAX_WORKERS,
+        max_queue_depth=MAX_QUEUE_DEPTH,
+        max_finished_jobs=MAX_FINISHED_JOBS,
+    ):
+        """
+        Runs simulation jobs in a bounded local process pool.
+
+        Parameters:
+            max_workers:
+                the number of simulations that run at the same time
+            max_queue_depth:
+                the number of queued and running jobs accepted before new jobs are rejected
+            max_finished_jobs:
+                the number of finished jobs kept for result retrieval, the oldest are dropped first
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs = OrderedDict()
+        # the ids of the jobs without a finish time, which have no progress steps to stop at
+        self._unstoppable_jobs = set()
+        # the results of finished jobs re-encoded in other media types, by job id
+        self._transcoded_results = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+        self._shut_down = False
+
+    def _start(self):
+        """
+        Starts the process pool on the first submitted job. Workers are spawned rather than
+        forked as the API serves requests from multiple threads. The pool is shut down when
+        the process exits.
+        """
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._progress = self._manager.dict()
+        self._cancelled = self._manager.dict()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=context
+        )
+        atexit.register(self.shutdown)
+
+    def submit(self, simulation_params, payload_params=None):
+        """
+        Queues a simulation job
+
+        Parameters:
+            simulation_params:
+                the keyword arguments for run_simulation
+            payload_params:
+                the keyword arguments for stream_simulation, the result is encoded with
+
+        Returns:
+            the job id
+        """
+        with self._lock:
+            self._check_running()
+            if self._executor is None:
+                self._start()
+            active_jobs = [f for f in self._jobs.values() if not f.done()]
+            if len(active_jobs) >= self.max_queue_depth:
+                raise QueueFullError()
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = self._executor.submit(
+                run_job,
+                job_id,
+                simulation_params,
+                payload_params or {},
+                self._progress,
+                self._cancelled,
+            )
+            if simulation_params.get("finish_time") is None:
+                self._unstoppable_jobs.add(job_id)
+            self._evict_finished_jobs()
+        return job_id
+
+    def _evict_finished_jobs(self):
+        finished_jobs = [job_id for job_id, f in self._jobs.items() if f.done()]
+        for job_id in finished_jobs[: len(finished_jobs) - self.max_finished_jobs]:
+            del self._jobs[job_id]
+            self._unstoppable_jobs.discard(job_id)
+            self._transcoded_results.pop(job_id, None)
+            self._progress.pop(job_id, None)
+            self._cancelled.pop(job_id, None)
+
+    def _check_running(self):
+        """
+        Raises ShutDownError once the manager has been shut down, as the shared progress
+        and cancel flags are gone
+        """
+        if self._shut_down:
+            raise ShutDownError()
+
+    def has_job(self, job_id):
+        return job_id in self._jobs
+
+    def get_status(self, job_id):
+        """
+        Returns:
+            queued, running, finished, failed or cancelled
+        """
+        self._check_running()
+        future = self._jobs[job_id]
+        if future.cancelled():
+            return "cancelled"
+        if not future.done():
+            if self._cancelled.get(job_id, False):
+                return "cancelled"
+            return "running" if job_id in self._progress else "queued"
+        exception = future.exception()
+        if isinstance(exception, JobCancelled):
+            return "cancelled"
+        if exception is not None:
+            return "failed"
+        return "finished"
+
+    def get_progress(self, job_id):
+        if self.get_status(job_id) == "finished":
+            return 1.0
+        return self._progress.get(job_id, 0.0)
+
+    def get_error(self, job_id):
+        if self.get_status(job_id) != "failed":
+            return None
+        return str(self._jobs[job_id].exception())
+
+    def get_result(self, job_id, media_type=JSONWriter.media_type):
+        """
+        Returns:
+            the payload of a finished job in one of the MEDIA_TYPES. Jobs encode their
+            payload as JSON, it is only re-encoded once for each other media type
+        """
+        result = self._jobs[job_id].result()
+        if media_type == JSONWriter.media_type:
+            return result
+        with self._lock:
+            transcoded = self._transcoded_results.get(job_id, {}).get(media_type)
+        if transcoded is None:
+            transcoded = transcode(result, media_type)
+            with self._lock:
+                if job_id in self._jobs:
+                    results = self._transcoded_results.setdefault(job_id, {})
+                    results[media_type] = transcoded
+        return transcoded
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued job straight away, a running job stops at its next progress step.
+        A job without a finish time has no progress steps, so it cannot be cancelled once
+        it is running.
+
+        Returns:
+            False if the job has already ended or cannot be cancelled, True otherwise
+        """
+        self._check_running()
+        future = self._jobs[job_id]
+        if future.cancel():
+            return True
+        if future.done() or job_id in self._unstoppable_jobs:
+            return False
+        self._cancelled[job_id] = True
+        return True
+
+    def shutdown(self):
+        """
+        Cancels the queued jobs and stops the process pool and the shared state. Running
+        jobs stop at their next progress step, once the shared state is gone. The manager
+        cannot be used afterwards.
+        """
+        with self._lock:
+            if self._executor is None or self._shut_down:
+                self._shut_down = True
+                return
+            self._shut_down = True
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+            self._manager = None
+        atexit.unregister(self.shutdown)
@@ -1,5 +1,6 @@
 import simpy
 from mtdnetwork.component.time_network import TimeNetwork
+from mtdnetwork.component.time_generator import VariateStream
 from mtdnetwork.operation.mtd_operation import MTDOperation
 from mtdnetwork.data.constants import ATTACKER_THRESHOLD
 from mtdnetwork.component.adversary import Adversary
@@ -7,6 +8,9 @@ from mtdnetwork.operation.attack_operation import AttackOperation
 from mtdnetwork.statistic.evaluation import Evaluation
 from mtdnetwork.mtd import MTD
 
+# number of steps a simulation is split into when reporting progress
+PROGRESS_STEPS = 20
+
 
 def run_simulation(
     start_time=0,
@@ -21,6 +25,7 @@ def run_simulation(
     target_layer=4,
     total_database=2,
     seed=None,
+    progress_callback=None,
 ):
     """
 
@@ -38,6 +43,8 @@ def run_simulation(
     :param target_layer: the target layer in the network (for targetted attack scenario only)
     :param total_database: the number of database nodes used for computing DAP algorithm
     :param new_network: True: create new snapshots based on network size, False: load snapshots based on network size
+    :param seed: the seed for the network and the random time durations
+    :param progress_callback: called with the fraction of the simulation completed as the simulation runs
     """
     if total_endpoints is None:
         total_endpoints = 5
@@ -65,13 +72,19 @@ def run_simulation(
         target_layer=target_layer,
         total_database=total_database,
         seed=seed,
+        headless=True,
     )
 
     adversary = Adversary(network=time_network, attack_threshold=ATTACKER_THRESHOLD)
+    variates = VariateStream(seed=seed)
 
     # start attack
     attack_operation = AttackOperation(
-        env=env, end_event=end_event, adversary=adversary, proceed_time=0
+        env=env,
+        end_event=end_event,
+        adversary=adversary,
+        proceed_time=0,
+        variates=variates,
     )
     attack_operation.proceed_attack()
 
@@ -88,13 +101,22 @@ def run_simulation(
             custom_strategies=custom_strategies
             if scheme != "single"
             else custom_strategies[0],
+            variates=variates,
         )
         mtd_operation.proceed_mtd()
 
-    if finish_time is not None:
+    if finish_time is not None and progress_callback is not None:
+        # run the simulation in steps so that progress can be reported
+        duration = finish_time - start_time
+        for step in range(1, PROGRESS_STEPS + 1):
+            env.run(until=duration * step / PROGRESS_STEPS)
+            progress_callback(step / PROGRESS_STEPS)
+    elif finish_time is not None:
         env.run(until=(finish_time - start_time))
     else:
         env.run(until=end_event)
+        if progress_callback is not None:
+            progress_callback(1.0)
 
     evaluation = Evaluation(network=time_network, adversary=adversary)
     return evaluation
@@ -13,7 +13,8 @@ import matplotlib.pyplot as plt
 
 warnings.filterwarnings("ignore")
 plt.set_loglevel('WARNING')
-from run import dap_mtd_simulation, execute_multithreading, create_experiment_snapshots
+from run import dap_mtd_simulation, execute_multiprocessing, create_experiment_snapshots
 
 
-results = execute_multithreading(dap_mtd_simulation, iterations=100, num_threads=20, file_name='dap_mtd_sim')
+if __name__ == '__main__':
+    results = execute_multiprocessing(dap_mtd_simulation, iterations=100, file_name='dap_mtd_sim')
@@ -18,17 +18,18 @@ from mtdnetwork.mtd.osdiversityassignment import OSDiversityAssignment
 
 warnings.filterwarnings("ignore")
 plt.set_loglevel('WARNING')
-from run import multiple_mtd_simulation, execute_multithreading
+from run import multiple_mtd_simulation, execute_multiprocessing
 combination_mtds = [CompleteTopologyShuffle, IPShuffle, OSDiversity, ServiceDiversity, OSDiversityAssignment]
 
-combination_list = []
-for i in range(len(combination_mtds)):
-    for j in range(i+1, len(combination_mtds)):
-        combination_list.append((combination_mtds[i]().get_name() + " + " +
-                                 combination_mtds[j]().get_name(),
-                                 [combination_mtds[i], combination_mtds[j]]))
+if __name__ == '__main__':
+    combination_list = []
+    for i in range(len(combination_mtds)):
+        for j in range(i+1, len(combination_mtds)):
+            combination_list.append((combination_mtds[i]().get_name() + " + " +
+                                     combination_mtds[j]().get_name(),
+                                     [combination_mtds[i], combination_mtds[j]]))
 
-for combination_name, combination in combination_list:
-    print(combination_name)
-    results = execute_multithreading(multiple_mtd_simulation, iterations=100, num_threads=20,
-                                     file_name=combination_name, combination=combination)
+    for combination_name, combination in combination_list:
+        print(combination_name)
+        results = execute_multiprocessing(multiple_mtd_simulation, iterations=100,
+                                          file_name=combination_name, combination=combination)
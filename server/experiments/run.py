@@ -3,6 +3,7 @@ import logging
 import os
 import pandas as pd
 from mtdnetwork.component.time_network import TimeNetwork
+from mtdnetwork.component.time_generator import VariateStream
 from mtdnetwork.operation.mtd_operation import MTDOperation
 from mtdnetwork.data.constants import ATTACKER_THRESHOLD, OS_TYPES
 from mtdnetwork.component.adversary import Adversary
@@ -18,8 +19,8 @@ from mtdnetwork.mtd.servicediversity import ServiceDiversity
 from mtdnetwork.mtd.usershuffle import UserShuffle
 from mtdnetwork.mtd.osdiversityassignment import OSDiversityAssignment
 import random
-import threading
-import queue
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from mtdnetwork.mtd import MTD
 
 # logging.basicConfig(format='%(message)s', level=logging.INFO)
@@ -54,69 +55,59 @@ def save_evaluation_result(file_name, evaluations):
         )
 
 
-def thread_function(
-    start, end, result_queue, simulation_function, file_name=None, combination=None
-):
+def process_function(simulation_function, seeds, file_name=None, combination=None):
+    """
+    Runs one chunk of simulation iterations in a worker process.
+    Each iteration reseeds the global random states so that results do not depend on
+    which worker picks up the chunk.
+    """
     results = []
-    for i in range(start, end):
-        result = simulation_function(file_name, combination)
-        results.append(result)
-    result_queue.put(results)
-
-
-def execute_multithreading(
-    simulation_function, iterations=10, num_threads=5, file_name=None, combination=None
+    for seed in seeds:
+        random.seed(seed)
+        np.random.seed(seed)
+        results.append(simulation_function(file_name, combination))
+    return results
+
+
+def execute_multiprocessing(
+    simulation_function,
+    iterations=10,
+    num_workers=None,
+    chunk_size=1,
+    file_name=None,
+    combination=None,
+    seed=None,
 ):
-    # Define the range of the for loop
-    start = 0
-    end = iterations
-
-    # Create a queue to hold the results
-    result_queue = queue.Queue()
-
-    # Create a list to store the threads
-    threads = []
-
-    # Define the number of threads you want to use
-    num_threads = num_threads
-
-    # Calculate the chunk size for each thread
-    chunk_size = (end - start) // num_threads
-
-    # Create the threads and assign them their respective chunks
-    for i in range(num_threads):
-        start_index = start + i * chunk_size
-        end_index = start_index + chunk_size
-        if i == num_threads - 1:
-            end_index = (
-                end  # Make sure the last thread takes care of the remaining items
+    """
+    Runs a simulation function in a process pool and averages the results in submission order.
+
+    :param simulation_function: single_mtd_simulation, multiple_mtd_simulation or dap_mtd_simulation
+    :param iterations: the number of times the simulation function is run
+    :param num_workers: the number of worker processes, defaults to the number of CPUs
+    :param chunk_size: the number of iterations submitted to a worker at a time
+    :param file_name: the file name the results are saved to
+    :param combination: the MTD combination passed to the simulation function
+    :param seed: the seed every iteration seed is derived from
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(iterations).tolist()
+    chunks = [seeds[i : i + chunk_size] for i in range(0, iterations, chunk_size)]
+    average_result = AverageResult()
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(
+                process_function, simulation_function, chunk, file_name, combination
             )
-        thread = threading.Thread(
-            target=thread_function,
-            args=(
-                start_index,
-                end_index,
-                result_queue,
-                simulation_function,
-                file_name,
-                combination,
-            ),
-        )
-        threads.append(thread)
-
-    # Start the threads
-    for thread in threads:
-        thread.start()
-
-    # Wait for all the threads to finish
-    for thread in threads:
-        thread.join()
-
-    # Collect the results from the queue
-    results = []
-    while not result_queue.empty():
-        results += result_queue.get()
-    results_avg = construct_average_result(results)
+            for chunk in chunks
+        ]
+        # read the chunks in submission order so the saved rows and the averages do not
+        # depend on which worker finishes first
+        for future in futures:
+            for result in future.result():
+                save_evaluation_result(file_name, result)
+                average_result.add(result)
+
+    results_avg = average_result.get()
     pd.DataFrame(results_avg).to_csv(
         "experimental_data/results/" + file_name + "_avg.csv", index=False
     )
@@ -131,32 +122,72 @@ def create_experiment_snapshots(network_size_list):
         snapshot_checkpoint.save_snapshots_by_network_size(time_network, adversary)
 
 
-def construct_average_result(results):
-    results_avg = []
-    for i in range(len(results[0])):
-        mttc_i_list = [
-            r[i]["time_to_compromise"]
-            for r in results
-            if r[i]["host_compromise_ratio"] != 0
-        ]
-        if mttc_i_list:
-            mttc_i = sum(mttc_i_list) / len(mttc_i_list)
-            results_avg.append(
-                {
-                    "Name": results[0][i]["Name"],
-                    "Host Compromise ratio (compromised hosts / total hosts)": results[
-                        0
-                    ][i]["host_compromise_ratio"],
-                    "MTD Interval": results[0][i]["mtd_interval"],
-                    "Network Size": results[0][i]["network_size"],
-                    "MTD Execution Frequency": sum([r[i]["MEF"] for r in results])
-                    / len(results),
-                    "Attack Success Rate": sum([r[i]["ASR"] for r in results])
-                    / len(results),
-                    "Mean Time to Compromise (s)": mttc_i,
-                }
+class AverageResult:
+    def __init__(self):
+        """
+        Incrementally averages the results of simulation iterations, checkpoint by checkpoint.
+
+        Items are matched across iterations by their name, MTD interval, network size, host
+        compromise ratio and how often that combination came before it in the iteration, as
+        an iteration only has items for the checkpoints it reached and a sweep may repeat a
+        configuration (e.g. the OS type variants of dap_mtd_simulation). The checkpoints are
+        averaged in the order they are first seen.
+        """
+        self._iterations = 0
+        self._checkpoints = {}
+
+    def add(self, result):
+        self._iterations += 1
+        occurrences = {}
+        for item in result:
+            key = (
+                item["Name"],
+                item["mtd_interval"],
+                item["network_size"],
+                item["host_compromise_ratio"],
             )
-    return results_avg
+            occurrences[key] = occurrences.get(key, -1) + 1
+            key += (occurrences[key],)
+            checkpoint = self._checkpoints.setdefault(
+                key, {"MEF": 0, "ASR": 0, "MTTC": 0, "MTTC Total": 0}
+            )
+            checkpoint["MEF"] += item["MEF"]
+            checkpoint["ASR"] += item["ASR"]
+            if item["host_compromise_ratio"] != 0:
+                checkpoint["MTTC"] += item["time_to_compromise"]
+                checkpoint["MTTC Total"] += 1
+
+    def get(self):
+        results_avg = []
+        for (
+            name,
+            mtd_interval,
+            network_size,
+            host_compromise_ratio,
+            _,
+        ), checkpoint in self._checkpoints.items():
+            if checkpoint["MTTC Total"]:
+                results_avg.append(
+                    {
+                        "Name": name,
+                        "Host Compromise ratio (compromised hosts / total hosts)": host_compromise_ratio,
+                        "MTD Interval": mtd_interval,
+                        "Network Size": network_size,
+                        "MTD Execution Frequency": checkpoint["MEF"]
+                        / self._iterations,
+                        "Attack Success Rate": checkpoint["ASR"] / self._iterations,
+                        "Mean Time to Compromise (s)": checkpoint["MTTC"]
+                        / checkpoint["MTTC Total"],
+                    }
+                )
+        return results_avg
+
+
+def construct_average_result(results):
+    average_result = AverageResult()
+    for result in results:
+        average_result.add(result)
+    return average_result.get()
 
 
 def construct_experiment_result(name, mtd_interval, item, network_size):
@@ -178,7 +209,6 @@ def single_mtd_simulation(file_name, combination):
     """
     evaluations = []
     for mtd in mtd_strategies:
-        mtd_evaluation = []
         if mtd is None:
             scheme = "None"
             mtd_name = "NoMTD"
@@ -201,8 +231,6 @@ def single_mtd_simulation(file_name, combination):
                         mtd_name, mtd_interval, item, network_size
                     )
                     evaluations.append(result)
-                    mtd_evaluation.append(result)
-        save_evaluation_result(file_name, mtd_evaluation)
         print(mtd_name)
     return evaluations
 
@@ -215,7 +243,6 @@ def dap_mtd_simulation(file_name, combination):
     os_types_list = [random.sample(OS_TYPES, 2), random.sample(OS_TYPES, 3), OS_TYPES]
     evaluations = []
     for os_types in os_types_list:
-        mtd_evaluation = []
         for mtd_interval in [100, 200]:
             for network_size in [25, 50, 75, 100]:
                 (
@@ -237,8 +264,6 @@ def dap_mtd_simulation(file_name, combination):
                         mtd.get_name(), mtd_interval, item, network_size
                     )
                     evaluations.append(result)
-                    mtd_evaluation.append(result)
-        save_evaluation_result(file_name, mtd_evaluation)
         print(os_types)
     return evaluations
 
@@ -250,7 +275,6 @@ def multiple_mtd_simulation(file_name, combination):
     evaluations = []
 
     for scheme in ["random", "alternative", "simultaneous"]:
-        mtd_evaluation = []
         for mtd_interval in [100, 200]:
             for network_size in [25, 50, 75, 100]:
                 evaluation = execute_simulation(
@@ -267,8 +291,6 @@ def multiple_mtd_simulation(file_name, combination):
                         scheme, mtd_interval, item, network_size
                     )
                     evaluations.append(result)
-                    mtd_evaluation.append(result)
-        save_evaluation_result(file_name, mtd_evaluation)
         print(scheme)
     return evaluations
 
@@ -307,6 +329,10 @@ def execute_simulation(
     :param terminate_compromise_ratio: terminate the simulation if reached compromise ratio
     :param new_network: True: create new snapshots based on network size, False: load snapshots based on network size
     """
+    # seed the time durations from the global state process_function reseeds, before the
+    # network draws from it, so a change to the network layout cannot move the durations
+    variates = VariateStream(seed=np.random.randint(np.iinfo(np.int32).max))
+
     # initialise the simulation
     env = simpy.Environment()
     end_event = env.event()
@@ -346,7 +372,11 @@ def execute_simulation(
 
     # start attack
     attack_operation = AttackOperation(
-        env=env, end_event=end_event, adversary=adversary, proceed_time=0
+        env=env,
+        end_event=end_event,
+        adversary=adversary,
+        proceed_time=0,
+        variates=variates,
     )
     attack_operation.proceed_attack()
 
@@ -361,6 +391,7 @@ def execute_simulation(
             proceed_time=0,
             mtd_trigger_interval=mtd_interval,
             custom_strategies=custom_strategies,
+            variates=variates,
         )
         mtd_operation.proceed_mtd()
 
@@ -13,9 +13,9 @@ import matplotlib.pyplot as plt
 
 warnings.filterwarnings("ignore")
 plt.set_loglevel('WARNING')
-from run import single_mtd_simulation, execute_multithreading, create_experiment_snapshots
+from run import single_mtd_simulation, execute_multiprocessing, create_experiment_snapshots
 
-create_experiment_snapshots([25, 50, 75, 100])
+if __name__ == '__main__':
+    create_experiment_snapshots([25, 50, 75, 100])
 
-
-results = execute_multithreading(single_mtd_simulation, iterations=100, num_threads=20, file_name='single_mtd_sim')
+    results = execute_multiprocessing(single_mtd_simulation, iterations=100, file_name='single_mtd_sim')
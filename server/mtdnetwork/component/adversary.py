@@ -1,3 +1,4 @@
+from collections import deque
 from mtdnetwork.statistic.attack_statistics import AttackStatistics
 from mtdnetwork.data.constants import HACKER_ATTACK_ATTEMPT_MULTIPLER
 
@@ -5,11 +6,12 @@ from mtdnetwork.data.constants import HACKER_ATTACK_ATTEMPT_MULTIPLER
 class Adversary:
     def __init__(self, network, attack_threshold):
         self.network = network
-        self._compromised_users = []
-        self._compromised_hosts = []
-        self._host_stack = []
+        self._compromised_users = set()
+        # an ordered set, the keys are the compromised host IDs in the order they were compromised
+        self._compromised_hosts = {}
+        self._host_stack = deque()
         self._attack_counter = [0 for n in range(len(self.network.get_graph().nodes()))]
-        self._stop_attack = []
+        self._stop_attack = set()
         self._attack_threshold = attack_threshold
         self._pivot_host_id = -1
         self._curr_host_id = -1
@@ -30,20 +32,30 @@ class Adversary:
         """
         update compromised host ids for hosttopology shuffle
         """
-        new_compromised_hosts = []
+        new_compromised_hosts = {}
 
         for i in self._compromised_hosts:
             if i == host_id:
-                new_compromised_hosts.append(other_host_id)
+                new_compromised_hosts[other_host_id] = None
             elif i == other_host_id:
-                new_compromised_hosts.append(host_id)
+                new_compromised_hosts[host_id] = None
             else:
-                new_compromised_hosts.append(i)
+                new_compromised_hosts[i] = None
 
         self._compromised_hosts = new_compromised_hosts
 
     def get_compromised_hosts(self):
-        return self._compromised_hosts
+        """
+        Returns:
+            a list of the compromised host IDs in the order they were compromised
+        """
+        return list(self._compromised_hosts)
+
+    def is_host_compromised(self, host_id):
+        return host_id in self._compromised_hosts
+
+    def add_compromised_host(self, host_id):
+        self._compromised_hosts[host_id] = None
 
     def get_statistics(self):
         return self._attack_stats.get_record()
@@ -88,6 +100,9 @@ class Adversary:
     def get_compromised_users(self):
         return self._compromised_users
 
+    def add_compromised_users(self, users):
+        self._compromised_users.update(users)
+
     # public
     def get_curr_host(self):
         return self.curr_host
@@ -115,7 +130,7 @@ class Adversary:
         self._curr_attempts = curr_attempts
 
     def set_host_stack(self, host_stack):
-        self._host_stack = host_stack
+        self._host_stack = deque(host_stack)
 
     def set_curr_process(self, curr_process):
         self._curr_process = curr_process
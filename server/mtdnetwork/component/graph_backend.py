@@ -0,0 +1,198 @@
+import numpy as np
+import networkx as nx
+from collections import deque
+
+
+class GraphBackend:
+    """
+    The host level topology the simulation runs on, with nodes numbered from 0 and a
+    layer, a subnet and a host for each node. The networkx graph of the network is kept
+    for drawing and for the node-link export.
+    """
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph):
+        """
+        Builds the topology from a networkx graph with layer, subnet and optionally host node attributes.
+        """
+        raise NotImplementedError
+
+    def get_total_nodes(self):
+        raise NotImplementedError
+
+    def get_total_edges(self):
+        raise NotImplementedError
+
+    def get_neighbors(self, node):
+        """
+        Returns:
+            a list of the neighbours of the node, in the order networkx lists them
+        """
+        raise NotImplementedError
+
+    def get_layer(self, node):
+        raise NotImplementedError
+
+    def get_subnet(self, node):
+        raise NotImplementedError
+
+    def get_host(self, node):
+        """
+        Returns:
+            the Host instance placed on the node, None if there is no such node
+        """
+        raise NotImplementedError
+
+    def set_host(self, node, host):
+        raise NotImplementedError
+
+    def get_distances(self, sources, nodes=None):
+        """
+        Breadth first search from the sources.
+
+        Parameters:
+            sources:
+                the nodes the search starts from
+            nodes:
+                the nodes the search is restricted to, all nodes if None
+
+        Returns:
+            a dict of the number of nodes on the shortest path from the nearest source to every
+            reachable node, matching the path lengths from nx.shortest_path
+        """
+        raise NotImplementedError
+
+
+class NetworkxGraph(GraphBackend):
+    def __init__(self, graph: nx.Graph):
+        """
+        Adapter that runs the topology directly on the networkx graph.
+        """
+        self._graph = graph
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph):
+        return cls(graph)
+
+    def get_total_nodes(self):
+        return self._graph.number_of_nodes()
+
+    def get_total_edges(self):
+        return self._graph.number_of_edges()
+
+    def get_neighbors(self, node):
+        return list(self._graph.neighbors(node))
+
+    def get_layer(self, node):
+        return self._graph.nodes[node]["layer"]
+
+    def get_subnet(self, node):
+        return self._graph.nodes[node]["subnet"]
+
+    def get_host(self, node):
+        return self._graph.nodes.get(node, {}).get("host", None)
+
+    def set_host(self, node, host):
+        self._graph.nodes[node]["host"] = host
+
+    def get_distances(self, sources, nodes=None):
+        graph = self._graph if nodes is None else self._graph.subgraph(nodes)
+        distances = {source: 1 for source in sources if source in graph}
+        queue = deque(distances)
+        while queue:
+            node = queue.popleft()
+            for neighbor in graph.adj[node]:
+                if neighbor not in distances:
+                    distances[neighbor] = distances[node] + 1
+                    queue.append(neighbor)
+        return distances
+
+
+class CSRGraph(GraphBackend):
+    def __init__(self, indptr, indices, layers, subnets, hosts):
+        """
+        Compact topology with the adjacency in compressed sparse row arrays.
+
+        Parameters:
+            indptr:
+                the neighbours of node n are indices[indptr[n]:indptr[n + 1]]
+            indices:
+                the neighbours of every node, in node order
+            layers:
+                the layer of every node
+            subnets:
+                the subnet of every node
+            hosts:
+                the host table, the Host instance placed on every node
+        """
+        self._indptr = indptr
+        self._indices = indices
+        self._layers = layers
+        self._subnets = subnets
+        self._hosts = hosts
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph):
+        total_nodes = graph.number_of_nodes()
+        degrees = np.zeros(total_nodes, dtype=np.int64)
+        indices = []
+        layers = np.zeros(total_nodes, dtype=np.int64)
+        subnets = np.zeros(total_nodes, dtype=np.int64)
+        hosts = [None] * total_nodes
+        for node in range(total_nodes):
+            neighbors = graph.adj[node]
+            degrees[node] = len(neighbors)
+            indices.extend(neighbors)
+            attributes = graph.nodes[node]
+            layers[node] = attributes["layer"]
+            subnets[node] = attributes["subnet"]
+            hosts[node] = attributes.get("host")
+        indptr = np.zeros(total_nodes + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        return cls(indptr, np.array(indices, dtype=np.int64), layers, subnets, hosts)
+
+    def get_total_nodes(self):
+        return len(self._hosts)
+
+    def get_total_edges(self):
+        # every edge is listed under both of its nodes, the network graphs have no self loops
+        return len(self._indices) // 2
+
+    def get_neighbors(self, node):
+        return self._indices[self._indptr[node] : self._indptr[node + 1]].tolist()
+
+    def get_layer(self, node):
+        return int(self._layers[node])
+
+    def get_subnet(self, node):
+        return int(self._subnets[node])
+
+    def get_host(self, node):
+        if 0 <= node < len(self._hosts):
+            return self._hosts[node]
+        return None
+
+    def set_host(self, node, host):
+        self._hosts[node] = host
+
+    def get_distances(self, sources, nodes=None):
+        total_nodes = len(self._hosts)
+        allowed = np.ones(total_nodes, dtype=bool)
+        if nodes is not None:
+            allowed[:] = False
+            allowed[np.fromiter(nodes, dtype=np.int64)] = True
+        distances = np.zeros(total_nodes, dtype=np.int64)
+        frontier = np.array([s for s in sources if allowed[s]], dtype=np.int64)
+        distance = 1
+        # expand a whole level of the search at a time
+        while frontier.size:
+            distances[frontier] = distance
+            starts = self._indptr[frontier]
+            counts = self._indptr[frontier + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            neighbors = self._indices[offsets + np.arange(offsets.size)]
+            neighbors = neighbors[(distances[neighbors] == 0) & allowed[neighbors]]
+            frontier = np.unique(neighbors)
+            distance += 1
+        reached = np.flatnonzero(distances)
+        return dict(zip(reached.tolist(), distances[reached].tolist()))
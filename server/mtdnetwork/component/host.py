@@ -1,5 +1,6 @@
 import random
 import uuid
+from collections import deque
 import networkx as nx
 import mtdnetwork.data.constants as constants
 import mtdnetwork.component.services as services
@@ -81,7 +82,26 @@ class Host:
         return other.uuid == self.uuid
 
     def get_all_services(self):
-        return list(dict(nx.get_node_attributes(self.graph, "service")).values())
+        return [service for service in self._services if service is not None]
+
+    def get_service(self, node_id):
+        """
+        Returns:
+            the Service instance on a node of the internal network, None for the target node
+        """
+        return self._services[node_id]
+
+    def set_service(self, node_id, service):
+        self._services[node_id] = service
+        self.graph.nodes[node_id]["service"] = service
+        self._all_vulns = None
+
+    def get_port(self, node_id):
+        return self._ports[node_id]
+
+    def set_port(self, node_id, port):
+        self._ports[node_id] = port
+        self.graph.nodes[node_id]["port"] = port
 
     def get_test_values(self):
         return [
@@ -93,32 +113,18 @@ class Host:
         return self.total_nodes
 
     def get_all_vulns(self):
-        all_services = self.get_all_services()
-
-        total_vulns = 0
-
-        all_vulns = []
-        for service in all_services:
-            service_vulns = service.get_all_vulns()
-            total_vulns += len(service_vulns)
-
-            for v in service_vulns:
-                if v not in all_vulns:
-                    all_vulns.append(v)
-        # print("Services on this host has average of this many vulns: ", total_vulns/len(all_services))
-
-        return all_vulns
+        """
+        Returns:
+            the vulnerabilities of every service on the host without duplicates, in the order
+            they are first found. The list is kept until a service is set.
+        """
+        if self._all_vulns is None:
+            self._all_vulns = self.get_vulns_for_list(self.get_all_services())
+        return self._all_vulns
 
     def get_vulns_for_list(self, list):
-        vulns = []
-        for service in list:
-            service_vulns = service.get_all_vulns()
-
-            for v in service_vulns:
-                if v not in vulns:
-                    vulns.append(v)
-
-        return vulns
+        # vulnerabilities are hashed by identity so a dict removes duplicates and keeps the order
+        return [*dict.fromkeys(v for service in list for v in service.get_all_vulns())]
 
     def swap_network(self, network):
         self.network = network
@@ -130,9 +136,10 @@ class Host:
                 continue
             if not keep_ports:
                 node_port = Host.get_random_port(existing_ports=port_addresses)
-                self.graph.nodes[node_id]["port"] = node_port
-            self.graph.nodes[node_id]["service"] = service_generator.get_random_service(
-                self.os_type, self.os_version
+                self.set_port(node_id, node_port)
+            self.set_service(
+                node_id,
+                service_generator.get_random_service(self.os_type, self.os_version),
             )
 
     def set_compromised(self):
@@ -204,10 +211,10 @@ class Host:
         """
         Returns a dictionary of all non-target nodes and their vulnerabilities
         """
-        services = nx.get_node_attributes(self.graph, "service")
         return {
             service_id: service.get_vulns()
-            for (service_id, service) in services.items()
+            for (service_id, service) in enumerate(self._services)
+            if service is not None
         }
 
     def get_target_node(self):
@@ -254,28 +261,31 @@ class Host:
         Returns:
             a dict where the key is the service ID and the value is the Service instance
         """
-        services = nx.get_node_attributes(self.graph, "service")
+        services = self._services
         if just_exploited:
             return {
                 service_id: service
-                for (service_id, service) in services.items()
-                if service.is_exploited()
+                for (service_id, service) in enumerate(services)
+                if service is not None and service.is_exploited()
             }
         exposed_services = [
             host_id
-            for (host_id, service) in services.items()
-            if host_id in self.exposed_endpoints or service.is_exploited()
+            for (host_id, service) in enumerate(services)
+            if service is not None
+            and (host_id in self.exposed_endpoints or service.is_exploited())
         ]
 
         adjacent_services = []
+        found_services = set(exposed_services)
         for ec_service_id in exposed_services:
             if not services[ec_service_id].is_exploited():
                 continue
-            for n_id in self.graph.neighbors(ec_service_id):
+            for n_id in self._neighbors[ec_service_id]:
                 if n_id == self.target_node:
                     continue
-                if n_id not in exposed_services and n_id not in adjacent_services:
+                if n_id not in found_services:
                     adjacent_services.append(n_id)
+                    found_services.add(n_id)
 
         return {
             service_id: services[service_id]
@@ -293,8 +303,7 @@ class Host:
         """
         service_list = []
         for service_id in list:
-            service = self.graph.nodes.get(service_id, {}).get("service", None)
-            service_list.append(service)
+            service_list.append(self.get_service(service_id))
         return service_list
 
     def get_services_from_ports(self, discovered_service_ports, ignore_services=[]):
@@ -309,10 +318,8 @@ class Host:
         """
         discovered_service_ports = discovered_service_ports + self.exposed_endpoints
         exposed_services = self.get_services()
-        port_numbers = nx.get_node_attributes(self.graph, "port")
-        shortest_path_to_target = dict(
-            nx.single_target_shortest_path_length(self.graph, self.target_node)
-        )
+        port_numbers = self._ports
+        shortest_path_to_target = self._target_distances
 
         result = [
             {
@@ -335,32 +342,32 @@ class Host:
         )
 
     def port_scan(self):
-        port_numbers_dict = nx.get_node_attributes(self.graph, "port")
-        services = nx.get_node_attributes(self.graph, "service")
+        port_numbers_dict = self._ports
+        services = self._services
         port_numbers = []
 
-        service_q = []
-        seen = []
+        service_q = deque()
+        seen = set()
         for ec_service_id in self.exposed_endpoints:
             service_q.append(ec_service_id)
-            seen.append(ec_service_id)
+            seen.add(ec_service_id)
             port_numbers.append(port_numbers_dict[ec_service_id])
 
         while len(service_q) > 0:
-            service_id = service_q.pop(0)
+            service_id = service_q.popleft()
             service = services[service_id]
 
             if service_id not in self.exposed_endpoints:
                 port_numbers.append(port_numbers_dict[service_id])
 
             if service.is_exploited():
-                for n in self.graph.neighbors(service_id):
+                for n in self._neighbors[service_id]:
                     if n == self.target_node:
                         continue
                     if n in seen:
                         continue
                     service_q.append(n)
-                    seen.append(n)
+                    seen.add(n)
         return port_numbers
 
     def get_vulns(self, discovered_service_ports, ignore_services=[], roa_threshold=0):
@@ -406,7 +413,7 @@ class Host:
             if service_id not in self.compromised_services:
                 self.compromised_services.append(service_id)
                 self.colour_map[service_id] = "red"
-            if self.target_node in list(self.graph.neighbors(service_id)):
+            if self._target_distances[service_id] == 1:
                 self.set_compromised()
         return self.compromised
 
@@ -417,19 +424,17 @@ class Host:
         Returns:
             an action that returns a list a neighboring host ids
         """
-        neighbors = list(self.network.graph.neighbors(self.host_id))
+        neighbors = self.network.get_neighbors(self.host_id)
         return neighbors
 
     def get_ports(self):
         """
         Returns all of the ports on the host
         """
-        port_map = nx.get_node_attributes(self.graph, "port")
-        return sorted([port_map[s] for s in port_map], reverse=True)
+        return sorted([port for port in self._ports if port is not None], reverse=True)
 
     def get_ports_for_services(self, services):
-        port_map = nx.get_node_attributes(self.graph, "port")
-        return sorted([port_map[s] for s in services], reverse=True)
+        return sorted([self._ports[s] for s in services], reverse=True)
 
     def get_os_type_and_version(self):
         return self.os_type, self.os_version
@@ -470,43 +475,87 @@ class Host:
                 self.p_u_compromise = True
                 break
 
-    def graph_choose_target_and_exposed(self, graph, target_distance):
+    @staticmethod
+    def bfs_distances(adjacency, source):
+        """
+        Parameters:
+            adjacency:
+                a dict of the neighbours of each node
+            source:
+                the node to find the distances from
+
+        Returns:
+            a dict of the shortest path length from the source to every node it can reach
+        """
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbor in adjacency[node]:
+                if neighbor not in distances:
+                    distances[neighbor] = distances[node] + 1
+                    queue.append(neighbor)
+        return distances
+
+    def graph_choose_target_and_exposed(self, graph):
         """
         Chooses the target and exposed services on the internal network.
 
+        The target is the node with the most nodes at least the diameter - 1 away from it, which become
+        the exposed services. One level-synchronous BFS grows the set of nodes within each distance of
+        every node at once, as bitsets with a bit per node, until no set grows, which is the diameter.
+        Each level is a single pass over the edges, so the pass is O(diameter * m) word operations,
+        and a linear scan over the sizes of the sets within diameter - 2 picks the target.
+
         Exposed services means that an adversary can see the ports open externally
 
         Parameters:
             graph:
                 the graph that is being generated
-            target_distance:
-                the target distance from the target node for exposed services
+
+        Returns:
+            a tuple of the distances from the target node, the target node, the exposed services
+            and the services adjacent to the target
         """
-        shortest_path_length = dict(nx.all_pairs_shortest_path_length(graph))
         nodes_list = list(graph.nodes)
+        adjacency = {node: list(neighbors) for node, neighbors in graph.adjacency()}
+        node_bits = {node: 1 << i for i, node in enumerate(nodes_list)}
+        # within[d][i] has the bits of the nodes at most d away from nodes_list[i]
+        within = [[node_bits[x] for x in nodes_list]]
+        while True:
+            reached = dict(zip(nodes_list, within[-1]))
+            grown = []
+            for x in nodes_list:
+                bits = reached[x]
+                for n in adjacency[x]:
+                    bits |= reached[n]
+                grown.append(bits)
+            if grown == within[-1]:
+                break
+            within.append(grown)
+        diameter = len(within) - 1
+        target_distance = diameter - 1
 
-        exposed_endpoints, adjacent_to_target = [], []
         target_node = -1
-        exposed_endpoints = []
         target_count = -1
-
-        for x in nodes_list:
-            x_count = 0
-            e_endpoints = []
-            for y in nodes_list:
-                if shortest_path_length[x][y] >= target_distance:
-                    x_count += 1
-                    e_endpoints.append(y)
-
+        for i, x in enumerate(nodes_list):
+            # the nodes at least target_distance away are the ones not within target_distance - 1
+            if target_distance > 0:
+                x_count = len(nodes_list) - within[target_distance - 1][i].bit_count()
+            else:
+                x_count = len(nodes_list)
             if x_count > target_count:
                 target_node = x
                 target_count = x_count
-                exposed_endpoints = e_endpoints
 
-        if target_node in exposed_endpoints:
-            exposed_endpoints.remove(target_node)
+        target_distances = Host.bfs_distances(adjacency, target_node)
+        exposed_endpoints = [
+            y
+            for y in nodes_list
+            if y != target_node and target_distances[y] >= target_distance
+        ]
 
-        return shortest_path_length, target_node, exposed_endpoints, adjacent_to_target
+        return target_distances, target_node, exposed_endpoints, []
 
     def get_exposed_endpoints(self):
         return self.exposed_endpoints
@@ -517,65 +566,99 @@ class Host:
             k = 2
 
         self.graph = nx.connected_watts_strogatz_graph(self.total_nodes, k, p)
-        results = self.graph_choose_target_and_exposed(
-            self.graph, nx.diameter(self.graph) - 1
-        )
+        results = self.graph_choose_target_and_exposed(self.graph)
 
-        self.shortest_path_length = results[0]
         self.target_node = results[1]
         self.exposed_endpoints = results[2]
         self.adjacent_to_target = results[3]
 
+        exposed_set = set(self.exposed_endpoints)
         other_nodes = [
             node_id
             for node_id in range(self.total_nodes)
-            if node_id != self.target_node and node_id not in self.exposed_endpoints
+            if node_id != self.target_node and node_id not in exposed_set
         ]
+        other_set = set(other_nodes)
 
-        for o1_node in other_nodes:
+        # Every other node is connected to an exposed service and the target, and the other nodes
+        # are disconnected from each other. Only the edge changes that have an effect are made, in
+        # the same order as pairing up every two other nodes, so the neighbour order is unchanged.
+        for o_index, o1_node in enumerate(other_nodes):
             exposed_neighbors = [
-                n for n in self.graph.neighbors(o1_node) if n in self.exposed_endpoints
+                n for n in self.graph.neighbors(o1_node) if n in exposed_set
             ]
             if len(exposed_neighbors) == 0:
                 self.graph.add_edge(o1_node, random.choice(self.exposed_endpoints))
 
-            for o2_node in other_nodes:
-                if o1_node == o2_node:
-                    continue
-                if self.graph.has_edge(o1_node, o2_node):
-                    self.graph.remove_edge(o1_node, o2_node)
-                self.graph.add_edge(o1_node, self.target_node)
-                self.graph.add_edge(o2_node, self.target_node)
-
+            if o_index == 0:
+                for o2_node in other_nodes[1:]:
+                    if self.graph.has_edge(o1_node, o2_node):
+                        self.graph.remove_edge(o1_node, o2_node)
+                    self.graph.add_edge(o1_node, self.target_node)
+                    self.graph.add_edge(o2_node, self.target_node)
+            else:
+                self.graph.remove_edges_from(
+                    [
+                        (o1_node, o2_node)
+                        for o2_node in self.graph.neighbors(o1_node)
+                        if o2_node in other_set
+                    ]
+                )
+
+        # Exposed services are disconnected from each other, each removed edge is replaced by edges to
+        # random other nodes, in the order of the exposed services
+        exposed_index = {
+            node_id: index for index, node_id in enumerate(self.exposed_endpoints)
+        }
         for e1_node in self.exposed_endpoints:
-            for e2_node in self.exposed_endpoints:
-                if e1_node == e2_node:
-                    continue
-                if self.graph.has_edge(e1_node, e2_node):
-                    self.graph.remove_edge(e1_node, e2_node)
-                    if len(other_nodes) > 0:
-                        o1_node = random.choice(other_nodes)
-                        o2_node = random.choice(other_nodes)
-                        if not self.graph.has_edge(e1_node, o1_node):
-                            self.graph.add_edge(e1_node, o1_node)
-
-                        if not self.graph.has_edge(e2_node, o2_node):
-                            self.graph.add_edge(e2_node, o2_node)
-                    else:
-                        if nx.is_isolate(self.graph, e1_node):
-                            self.graph.add_edge(e1_node, self.target_node)
-                        if nx.is_isolate(self.graph, e2_node):
-                            self.graph.add_edge(e2_node, self.target_node)
+            exposed_neighbors = sorted(
+                (n for n in self.graph.neighbors(e1_node) if n in exposed_set),
+                key=lambda n: exposed_index[n],
+            )
+            for e2_node in exposed_neighbors:
+                self.graph.remove_edge(e1_node, e2_node)
+                if len(other_nodes) > 0:
+                    o1_node = random.choice(other_nodes)
+                    o2_node = random.choice(other_nodes)
+                    if not self.graph.has_edge(e1_node, o1_node):
+                        self.graph.add_edge(e1_node, o1_node)
+
+                    if not self.graph.has_edge(e2_node, o2_node):
+                        self.graph.add_edge(e2_node, o2_node)
+                else:
+                    if nx.is_isolate(self.graph, e1_node):
+                        self.graph.add_edge(e1_node, self.target_node)
+                    if nx.is_isolate(self.graph, e2_node):
+                        self.graph.add_edge(e2_node, self.target_node)
 
         self.colour_map = []
         for node in list(self.graph.nodes):
             if node == self.target_node:
                 self.colour_map.append("yellow")
-            elif node in self.exposed_endpoints:
+            elif node in exposed_set:
                 self.colour_map.append("green")
             else:
                 self.colour_map.append("blue")
 
+        self.index_internal_network()
+
+    def index_internal_network(self):
+        """
+        Caches the neighbours and the distance to the target node of every service node, as the
+        internal network does not change once it is generated. Ports and services are kept in
+        lists indexed by node ID that set_port and set_service keep in sync with the graph.
+        """
+        self._neighbors = [list(self.graph.adj[n]) for n in range(self.total_nodes)]
+        self._target_distances = [None] * self.total_nodes
+        # the internal network is undirected so the distances from the target are the distances to it
+        for node_id, distance in nx.single_source_shortest_path_length(
+            self.graph, self.target_node
+        ).items():
+            self._target_distances[node_id] = distance
+        self._ports = [None] * self.total_nodes
+        self._services = [None] * self.total_nodes
+        self._all_vulns = None
+
     def draw(self):
         """
         Draws the internal network for the Host
@@ -621,7 +704,7 @@ class Host:
 
         Parameters:
             existing_addresses:
-                a list of already allocated IP addresses on the network
+                the already allocated IP addresses on the network
 
         Returns:
             a IPv4 address
@@ -684,13 +767,16 @@ class Host:
 
         return shortest_path
 
-    def to_json(self):
-        graph = nx.node_link_data(self.graph)
-        for node in graph["nodes"]:
-            if node.get("service"):
-                node["service"] = node["service"].to_json()
-
-        return {
+    def to_json(self, service_table=None, with_graph=True):
+        """
+        Parameters:
+            service_table:
+                a ServiceTable the services are added to and referenced from,
+                None to embed the services with their vulnerabilities
+            with_graph:
+                False to leave out the internal graph of the host and its services
+        """
+        data = {
             "osType": self.os_type,
             "osVersion": self.os_version,
             "ip": self.ip,
@@ -702,5 +788,16 @@ class Host:
             "totalNodes": self.total_nodes,
             "compromised": self.compromised,
             "compromisedServices": self.compromised_services,
-            "graph": graph,
         }
+        if not with_graph:
+            return data
+
+        graph = nx.node_link_data(self.graph)
+        for node in graph["nodes"]:
+            if node.get("service"):
+                if service_table is None:
+                    node["service"] = node["service"].to_json()
+                else:
+                    node["service"] = service_table.to_json(node["service"])
+        data["graph"] = graph
+        return data
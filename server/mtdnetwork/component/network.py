@@ -7,11 +7,57 @@ import random
 import mtdnetwork.data.constants as constants
 import mtdnetwork.component.services as services
 from mtdnetwork.component.host import Host
+from mtdnetwork.component.graph_backend import GraphBackend, CSRGraph, NetworkxGraph
 from mtdnetwork.statistic.scorer import Scorer
 import os
 
 
+class UnionFind:
+    def __init__(self, elements):
+        """
+        Disjoint sets of elements, joined with union by size and path halving.
+
+        Parameters:
+            elements:
+                the elements, each starting in a set of its own
+        """
+        self._parent = {e: e for e in elements}
+        self._size = {e: 1 for e in self._parent}
+        self._total_components = len(self._parent)
+
+    def find(self, element):
+        parent = self._parent
+        while parent[element] != element:
+            parent[element] = parent[parent[element]]
+            element = parent[element]
+        return element
+
+    def union(self, a, b):
+        """
+        Joins the sets of a and b
+
+        Returns:
+            True if a and b were in different sets
+        """
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+        self._total_components -= 1
+        return True
+
+    def get_total_components(self):
+        return self._total_components
+
+
 class Network:
+    # the topology the simulation runs on, built from the networkx graph each time it is generated
+    graph_backend = CSRGraph
+
     def __init__(
         self,
         total_nodes: int,
@@ -23,6 +69,7 @@ class Network:
         users_to_nodes_ratio: float = constants.USER_TO_NODES_RATIO,
         prob_user_reuse_pass: float = constants.USER_PROB_TO_REUSE_PASS,
         seed: int = None,
+        headless: bool = False,
     ):
         """
         Initialises the state of the network for the simulation.
@@ -44,16 +91,30 @@ class Network:
                 the probability that a user has reused their password.
             seed:
                 the seed for the random number generator if one needs to be set
+            headless:
+                True to never compute the node positions used for drawing the network,
+                for API and batch runs.
         """
         if seed is not None:
             random.seed(seed)
 
         self.graph: nx.Graph = None
+        self.topology: GraphBackend = None
+        # the graph the topology was built from
+        self._topology_graph: nx.Graph = None
+        # host, layer and subnet of every node, rebuilt with the graph and updated as hosts are placed
+        self._host_index: dict = {}
+        self._layer_index: dict = {}
+        self._subnet_index: dict = {}
         self.colour_map: list = None
         self.users_per_host: int = None
         self.total_users: int = None
         self.users_list: list = None
-        self.pos: dict = None
+        # node positions for drawing, computed on first use and reset when the graph is regenerated
+        self._pos: dict = None
+        self.headless: bool = headless
+        # the number of nodes in each subnet of each layer
+        self.subnet_nodes: list = []
 
         self.total_nodes: int = total_nodes
         self.total_endpoints: int = total_endpoints
@@ -74,8 +135,14 @@ class Network:
         self.nodes: list = [n for n in range(total_nodes)]
         self.mtd_strategies: list = []
 
-        self.reachable: list = []
-        self.compromised_hosts: list = []
+        self.reachable: set = set()
+        self.compromised_hosts: set = set()
+        # exposed endpoints, reachable hosts and their neighbours, kept up to date with reachable
+        self._visible_hosts: set = set(self.exposed_endpoints)
+        self._visible_graph: nx.Graph = None
+        # hop distances from the exposed endpoints and from the pivot host, cached per graph
+        self._exposed_distances: tuple = (None, {})
+        self._pivot_distances: tuple = (None, None, {})
         self.node_per_layer: list = []
         # Network type 0 is a targetted attack, Network type 1 is a general attack (no target node)
         self.network_type: int = 1
@@ -153,8 +220,6 @@ class Network:
             if subnets_per_layer[s_index] <= max_subnets_per_layer:
                 subnets_per_layer[s_index] = subnets_per_layer[s_index] + 1
 
-        max_subnet_in_layer = max(subnets_per_layer)
-
         # Assign nodes to each layer
         nodes_per_layer = [self.total_endpoints]
         # Appends the minimum number of nodes that should be in the layer
@@ -177,15 +242,13 @@ class Network:
                 temp_subnet_nodes[n_index] = temp_subnet_nodes[n_index] + 1
             subnet_nodes.append(temp_subnet_nodes)
 
-        # self.graphenerate the graph
+        # Generate the graph, the edges of every subnet are collected and added in bulk
         self.graph = nx.Graph()
         # Node offset
         node_id = 0
         self.colour_map = []
-        self.pos = {}
-        attr = {}
-        min_y_pos = 200000
-        max_y_pos = -200000
+        nodes = []
+        edges = []
         # Layer = i, subnet = j, s_nodes = # of nodes in subnet
         for i, subnet_node_list in enumerate(subnet_nodes):
             for j, s_nodes in enumerate(subnet_node_list):
@@ -195,50 +258,14 @@ class Network:
                 elif m >= s_nodes:
                     m = s_nodes - 1
                 subgraph = nx.barabasi_albert_graph(s_nodes, m)
-                new_node_mapping = {k: k + node_id for k in range(s_nodes)}
-                subgraph = nx.relabel_nodes(subgraph, new_node_mapping)
-                new_attr = {
-                    k + node_id: {"subnet": j, "layer": i} for k in range(s_nodes)
-                }
-                attr = {**attr, **new_attr}
+                nodes.extend(
+                    (k + node_id, {"subnet": j, "layer": i}) for k in range(s_nodes)
+                )
+                edges.extend((u + node_id, v + node_id) for u, v in subgraph.edges())
 
                 # Setting offset to next empty node
                 node_id += s_nodes
 
-                subgraph_pos = nx.spring_layout(subgraph)
-                if i != 0:
-                    subgraph_pos = {
-                        k: np.array(
-                            [
-                                v[0] + i * 2.25,
-                                v[1]
-                                + j * 3
-                                + 1.5 * (max_subnet_in_layer -
-                                         len(subnet_node_list)),
-                            ]
-                        )
-                        for k, v in subgraph_pos.items()
-                    }
-
-                    for k, v in subgraph_pos.items():
-                        y = (
-                            v[1]
-                            + j * 3
-                            + 1.5 * (max_subnet_in_layer -
-                                     len(subnet_node_list))
-                        )
-                        subgraph_pos[k] = np.array([v[0] + i * 2.25, y])
-                        if y < min_y_pos:
-                            min_y_pos = y
-                        if y > max_y_pos:
-                            max_y_pos = y
-                else:
-                    subgraph_pos = {
-                        k: np.array([0, k]) for k, _v in subgraph_pos.items()
-                    }
-                # Stores all the positions of items from subgraphs
-                self.pos = {**self.pos, **subgraph_pos}
-
                 # Selects Target Host
                 if (
                     i == self.target_layer
@@ -250,14 +277,10 @@ class Network:
                     print("Target Node is: ", self.target_node)
 
                 # Assigns Colour of nodes based on constant key
-                for k in range(s_nodes):
-                    self.colour_map.append(constants.NODE_COLOURS[i])
+                self.colour_map.extend([constants.NODE_COLOURS[i]] * s_nodes)
 
-                # Adds Subgraph to final graph
-                self.graph = nx.compose(self.graph, subgraph)
-
-        # Defines Nodes for whole graph
-        nx.set_node_attributes(self.graph, attr)
+        self.graph.add_nodes_from(nodes)
+        self.graph.add_edges_from(edges)
 
         # Connect the graph
         def get_other_node(node_list, node_degrees, other_node):
@@ -266,46 +289,84 @@ class Network:
                 return get_other_node(node_list, node_degrees, other_node)
             return n
 
-        while not nx.is_connected(self.graph):
-            node_layers = nx.get_node_attributes(self.graph, "layer")
+        layer_nodes = [[] for _i in range(self.layers)]
+        for n, layer in self.graph.nodes(data="layer"):
+            layer_nodes[layer].append(n)
+        # Degrees of the nodes in each layer, in the order of layer_nodes
+        layer_degrees = [[self.graph.degree(n) for n in nodes] for nodes in layer_nodes]
+        layer_index = {n: k for nodes in layer_nodes for k, n in enumerate(nodes)}
+
+        # Components of the whole graph, of every layer and of every pair of adjacent layers,
+        # so connectivity is known without a traversal after each added edge
+        graph_components = UnionFind(self.graph.nodes)
+        layer_components = [UnionFind(nodes) for nodes in layer_nodes]
+        pair_components = [
+            UnionFind(layer_nodes[i] + layer_nodes[i + 1])
+            for i in range(self.layers - 1)
+        ]
+
+        def join_components(u, v):
+            u_layer = self.graph.nodes[u]["layer"]
+            v_layer = self.graph.nodes[v]["layer"]
+            graph_components.union(u, v)
+            if u_layer == v_layer:
+                layer_components[u_layer].union(u, v)
+                if u_layer > 0:
+                    pair_components[u_layer - 1].union(u, v)
+                if u_layer < self.layers - 1:
+                    pair_components[u_layer].union(u, v)
+            else:
+                pair_components[min(u_layer, v_layer)].union(u, v)
+
+        def add_edge(u, v):
+            if self.graph.has_edge(u, v):
+                return
+            self.graph.add_edge(u, v)
+            layer_degrees[self.graph.nodes[u]["layer"]][layer_index[u]] += 1
+            layer_degrees[self.graph.nodes[v]["layer"]][layer_index[v]] += 1
+            join_components(u, v)
+
+        for u, v in edges:
+            join_components(u, v)
+
+        while graph_components.get_total_components() > 1:
             for i in range(self.layers - 1):
-                node_a = [n for n in node_layers if node_layers[n] == i]
-                degree_node_a = [self.graph.degree(n) for n in node_a]
-                node_b = [n for n in node_layers if node_layers[n] == i + 1]
-                degree_node_b = [self.graph.degree(n) for n in node_b]
+                node_a = layer_nodes[i]
+                degree_node_a = layer_degrees[i].copy()
+                node_b = layer_nodes[i + 1]
+                degree_node_b = layer_degrees[i + 1].copy()
 
                 n_a1 = random.choices(node_a, weights=degree_node_a, k=1)[0]
-                if not nx.is_connected(self.graph.subgraph(node_a + node_b)):
+                if pair_components[i].get_total_components() > 1:
                     n_b = random.choices(node_b, weights=degree_node_b, k=1)[0]
-                    self.graph.add_edge(n_a1, n_b)
+                    add_edge(n_a1, n_b)
                 if (
                     random.random() < prob_inter_layer_edge
                     and subnets_per_layer[i] > 1
-                    and not nx.is_connected(self.graph.subgraph(node_a))
+                    and layer_components[i].get_total_components() > 1
                 ):
                     n_a2 = get_other_node(node_a, degree_node_a, n_a1)
-                    self.graph.add_edge(n_a1, n_a2)
+                    add_edge(n_a1, n_a2)
 
-        endpoint_nodes_list = [n for n in range(self.total_endpoints)]
         blank_endpoints = []
 
         # Remove edges between endpoint nodes (not needed since adversary can reach them all anyway)
         # Store all external nodes with no internal nodes into blank_endpoints
-        for n in endpoint_nodes_list:
-            neighbors = list(self.graph.neighbors(n))
-            for neighbor in neighbors:
-                if neighbor in endpoint_nodes_list:
-                    self.graph.remove_edge(n, neighbor)
-            internal_connection = list(self.graph.neighbors(n))
-            if not internal_connection:
+        for n in range(self.total_endpoints):
+            self.graph.remove_edges_from(
+                [
+                    (n, neighbor)
+                    for neighbor in self.graph.neighbors(n)
+                    if neighbor < self.total_endpoints
+                ]
+            )
+            if self.graph.degree(n) == 0:
                 blank_endpoints.append(n)
 
         # Pulls from blank_endpoints until all exposed endpoints are connected
-        node_layers = nx.get_node_attributes(self.graph, "layer")
-        layer1_nodes = [n for n in node_layers if node_layers[n] == 1]
+        layer1_nodes = layer_nodes[1]
         layer1_weights = [self.graph.degree(n) for n in layer1_nodes]
-        while len(blank_endpoints):
-            endpoint = blank_endpoints.pop(0)
+        for endpoint in blank_endpoints:
             other_node = random.choices(
                 layer1_nodes, weights=layer1_weights, k=1)[0]
             self.graph.add_edge(endpoint, other_node)
@@ -314,17 +375,99 @@ class Network:
         if self.network_type == 0:
             self.colour_map[self.target_node] = "red"
 
+        # Update Nodes Per Layer for Complete topology shuffling
+        self.node_per_layer = nodes_per_layer.copy()
+        self.node_per_layer[0] = self.total_endpoints
+
+        self.subnet_nodes = subnet_nodes
+        self._pos = None
+        self.index_graph()
+
+    def index_graph(self):
+        """
+        Builds the topology and the host, layer and subnet indexes from the graph.
+
+        Must be called after the edges of the graph are changed in place, edges that
+        are only added or removed are also picked up by sync_topology.
+        """
+        self.topology = self.graph_backend.from_networkx(self.graph)
+        self._topology_graph = self.graph
+        # the visible graph and the distances were found on the previous topology
+        self._visible_graph = None
+        self._exposed_distances = (None, {})
+        self._pivot_distances = (None, None, {})
+        self._host_index = {
+            n: host for n, host in self.graph.nodes(data="host") if host is not None
+        }
+        self._layer_index = dict(self.graph.nodes(data="layer"))
+        self._subnet_index = dict(self.graph.nodes(data="subnet"))
+
+    def gen_layout(self, seed=0):
+        """
+        Positions the nodes for drawing, each subnet is laid out with a spring layout
+        and placed in a column for its layer with the exposed endpoints on the left.
+
+        Parameters:
+            seed:
+                the seed for the spring layouts, kept apart from the random state of the simulation
+                so that the results do not depend on whether the network is drawn
+        """
+        layout_random_state = np.random.RandomState(seed)
+        pos = {}
+        max_subnet_in_layer = max(
+            len(subnet_node_list) for subnet_node_list in self.subnet_nodes
+        )
+        min_y_pos = 200000
+        max_y_pos = -200000
+        node_id = 0
+        for i, subnet_node_list in enumerate(self.subnet_nodes):
+            for j, s_nodes in enumerate(subnet_node_list):
+                subnet = range(node_id, node_id + s_nodes)
+                node_id += s_nodes
+                subgraph = nx.Graph()
+                subgraph.add_nodes_from(subnet)
+                subgraph.add_edges_from(
+                    (u, v)
+                    for u in subnet
+                    for v in self.graph.neighbors(u)
+                    if v in subnet
+                )
+                subgraph_pos = nx.spring_layout(subgraph, seed=layout_random_state)
+                if i != 0:
+                    for k, v in subgraph_pos.items():
+                        x = v[0] + i * 2.25 * 2
+                        y = v[1] + 2 * (
+                            j * 3 + 1.5 * (max_subnet_in_layer - len(subnet_node_list))
+                        )
+                        subgraph_pos[k] = np.array([x, y])
+                        if y < min_y_pos:
+                            min_y_pos = y
+                        if y > max_y_pos:
+                            max_y_pos = y
+                # Stores all the positions of items from subgraphs
+                pos.update(subgraph_pos)
+
         # Fix positions for endpoints
         for n in range(self.total_endpoints):
             position = (n + 1) / self.total_endpoints * (
                 max_y_pos - min_y_pos
             ) + min_y_pos
-            new_pos = {n: np.array([0, position])}
-            self.pos.update(new_pos)
+            pos[n] = np.array([0, position])
+        self._pos = pos
 
-        # Update Nodes Per Layer for Complete topology shuffling
-        self.node_per_layer = nodes_per_layer.copy()
-        self.node_per_layer[0] = self.total_endpoints
+    @property
+    def pos(self):
+        """
+        Returns:
+            the node positions for drawing, None in headless mode
+        """
+        if self._pos is None and not self.headless and self.graph is not None:
+            self.gen_layout()
+        return self._pos
+
+    @pos.setter
+    def pos(self, pos):
+        self._pos = pos
 
     def get_total_endpoints(self):
         return self.total_endpoints
@@ -348,13 +491,26 @@ class Network:
         return self.service_generator
 
     def get_hosts(self):
-        return dict(nx.get_node_attributes(self.graph, "host"))
+        """
+        Returns:
+            a dict of the Host instance on each node, a copy that does not change as
+            hosts are placed
+        """
+        return dict(self._host_index)
 
     def get_subnets(self):
-        return dict(nx.get_node_attributes(self.graph, "subnet"))
+        """
+        Returns:
+            a dict of the subnet of each node
+        """
+        return dict(self._subnet_index)
 
     def get_layers(self):
-        return dict(nx.get_node_attributes(self.graph, "layer"))
+        """
+        Returns:
+            a dict of the layer of each node
+        """
+        return dict(self._layer_index)
 
     def get_graph(self) -> nx.Graph:
         return self.graph
@@ -395,7 +551,7 @@ class Network:
     def get_reachable(self):
         """
         Returns:
-            The reachable array
+            The set of reachable host IDs
         """
         return self.reachable
 
@@ -430,7 +586,8 @@ class Network:
         """
         shortest_path = self.get_path_from_exposed(
             self.target_node, self.graph)[0]
-        vuln_list = []
+        # vulnerabilities are compared by identity, so a set finds the ones already on the path
+        seen_vulns = set()
         total_score = 0
         for host_id in shortest_path:
             host = self.get_host(host_id)
@@ -444,8 +601,8 @@ class Network:
                 total_host_vulns = len(vulns) + total_host_vulns
 
                 for vuln in vulns:
-                    if vuln not in vuln_list:
-                        vuln_list.append(vuln)
+                    if vuln not in seen_vulns:
+                        seen_vulns.add(vuln)
                     else:
                         not_unique_host_vulns = not_unique_host_vulns + 1
             if total_host_vulns - not_unique_host_vulns == 0:
@@ -491,70 +648,63 @@ class Network:
 
         self.users_per_host = users_per_host
 
-    def update_reachable_mtd(self):
+    def sync_topology(self):
+        """
+        Rebuilds the topology if the graph has been replaced, or if nodes or edges have
+        been added to or removed from it, since the topology was built.
         """
-        Updates the Reachable array with only compromised nodes that are reachable after MTD
-        NOTE: Probably can be optimised for speed
+        if (
+            self._topology_graph is not self.graph
+            or self.topology.get_total_nodes() != self.graph.number_of_nodes()
+            or self.topology.get_total_edges() != self.graph.number_of_edges()
+        ):
+            self.index_graph()
+
+    def update_reachable_mtd(self, compromised_hosts=None):
         """
-        self.reachable = self.exposed_endpoints.copy()
-        compromised_neighbour_nodes = []
+        Rebuilds the reachable set with only compromised nodes that are reachable after MTD.
+        Called once by topology MTDs after the graph has changed.
 
-        # Appends all neighbouring hosts from endpoints
+        Parameters:
+            compromised_hosts:
+                the host IDs the hacker has compromised, if the MTD has changed them
+        """
+        self.sync_topology()
+        if compromised_hosts is not None:
+            self.compromised_hosts = set(compromised_hosts)
+        self.reachable = set()
+        self._visible_hosts = set(self.exposed_endpoints)
+        self._visible_graph = None
         for endpoint in self.exposed_endpoints:
-            visible_hosts = list(self.graph.neighbors(endpoint))
-            for host in visible_hosts:
-                for c_host in self.compromised_hosts:
-                    if host == c_host:
-                        compromised_neighbour_nodes.append(host)
-                        self.reachable.append(host)
-
-        # Checks if neighbouring hosts of compromised node are also compromised, if so add them to the list
-        while len(compromised_neighbour_nodes) != 0:
-            appended_host = compromised_neighbour_nodes.pop(0)
-            visible_hosts = list(self.graph.neighbors(appended_host))
-            for host in visible_hosts:
-                for c_host in self.compromised_hosts:
-                    if host == c_host:
-                        if host not in self.reachable:
-                            compromised_neighbour_nodes.append(host)
-                            self.reachable.append(host)
-                        # repeated = False
-                        # for reachable in self.reachable:
-                        #     if reachable == host:
-                        #         repeated = True
-                        # if repeated == False:
-                        #     compromised_neighbour_nodes.append(host)
-                        #     self.reachable.append(host)
+            self._add_reachable(endpoint)
 
     def update_reachable_compromise(self, compromised_node_id, compromised_hosts):
         """
-        Updates the Reachable with the node_id of the compromised node
-        """
-        self.reachable.append(compromised_node_id)
-        appended_host = compromised_node_id
-        self.compromised_hosts = compromised_hosts
-        all_reachable_hosts_added = False
-        compromised_neighbour_nodes = []
-
-        # Checks if neighbouring hosts of compromised node are also compromised, if so add them to the list
-        while not all_reachable_hosts_added:
-            visible_hosts = list(self.graph.neighbors(appended_host))
-            for host in visible_hosts:
-                for c_host in compromised_hosts:
-                    if host == c_host:
-                        # repeated = False
-                        # for reachable in self.reachable:
-                        #     if reachable == host:
-                        #         repeated = True
-                        # if repeated == False:
-                        if host not in self.reachable:
-                            compromised_neighbour_nodes.append(host)
-                            self.reachable.append(host)
-
-            if len(compromised_neighbour_nodes) == 0:
-                all_reachable_hosts_added = True
-            else:
-                appended_host = compromised_neighbour_nodes.pop(0)
+        Updates the reachable set with the node_id of the compromised node and
+        the compromised nodes that become reachable through it
+        """
+        self.compromised_hosts.add(compromised_node_id)
+        self._add_reachable(compromised_node_id)
+
+    def _add_reachable(self, host_id):
+        """
+        Adds a host to the reachable set along with every compromised host connected to it
+        through compromised hosts, updating the visible hosts by the neighbours of each added host
+        """
+        added_hosts = [host_id]
+        self.reachable.add(host_id)
+        while len(added_hosts) != 0:
+            added_host = added_hosts.pop()
+            self._visible_hosts.add(added_host)
+            for neighbor in self.topology.get_neighbors(added_host):
+                self._visible_hosts.add(neighbor)
+                if (
+                    neighbor in self.compromised_hosts
+                    and neighbor not in self.reachable
+                ):
+                    added_hosts.append(neighbor)
+                    self.reachable.add(neighbor)
+        self._visible_graph = None
 
     def get_host_id_priority(self, host_id):
         """
@@ -568,8 +718,7 @@ class Network:
         """
         if host_id == self.target_node:
             return 0
-        layers = self.get_layers()
-        host_layer = layers.get(host_id)
+        host_layer = self._layer_index.get(host_id)
         priority = -1
         i = 0
         for tag in self.tag_priority:
@@ -647,6 +796,47 @@ class Network:
 
         return shortest_path, shortest_distance
 
+    def _bfs_distances(self, graph, sources):
+        """
+        Returns the number of nodes on the shortest path from the nearest source to every node
+        reachable from the sources in the graph.
+
+        The network graph and the hacker visible graph, the subgraph it induces, are searched
+        on the topology. Any other graph is searched on its own edges.
+        """
+        self.sync_topology()
+        if graph is self.graph:
+            return self.topology.get_distances(sources)
+        if graph is self._visible_graph:
+            return self.topology.get_distances(sources, nodes=graph.nodes)
+        return NetworkxGraph(graph).get_distances(sources)
+
+    def get_distance_from_exposed(self, target_node, graph=None):
+        """
+        Gets the shortest distance from the exposed endpoints, the same distance as get_path_from_exposed.
+
+        The distances to every node are computed with one multi-source BFS and reused until a
+        different graph is passed in. The hacker visible graph is a new graph each time the
+        visible hosts change, so a compromise or a topology MTD invalidates the distances.
+
+        Parameters:
+            target_node:
+                the target node to reach to
+            graph:
+                the subgraph to use for finding, the whole network graph if None
+
+        Returns:
+            the number of nodes on the shortest path, constants.LARGE_INT if it cannot be reached
+        """
+        if graph is None:
+            graph = self.graph
+        if self._exposed_distances[0] is not graph:
+            self._exposed_distances = (
+                graph,
+                self._bfs_distances(graph, self.exposed_endpoints),
+            )
+        return self._exposed_distances[1].get(target_node, constants.LARGE_INT)
+
     def get_shortest_distance_from_exposed_or_pivot(
         self, host_id, pivot_host_id=-1, graph=None
     ):
@@ -654,16 +844,18 @@ class Network:
             return 0
         if graph is None:
             graph = self.graph
-        shortest_distance = self.get_path_from_exposed(host_id, graph=graph)[1]
+        shortest_distance = self.get_distance_from_exposed(host_id, graph=graph)
         if pivot_host_id >= 0:
-            try:
-                path = nx.shortest_path(graph, host_id, pivot_host_id)
-                path_len = len(path)
-
-                if path_len < shortest_distance:
-                    shortest_distance = path_len
-            except Exception:
-                logging.error("Failed to find shortest distance")
+            cached_graph, cached_pivot_host_id, _ = self._pivot_distances
+            if cached_graph is not graph or cached_pivot_host_id != pivot_host_id:
+                self._pivot_distances = (
+                    graph,
+                    pivot_host_id,
+                    self._bfs_distances(graph, [pivot_host_id]),
+                )
+            path_len = self._pivot_distances[2].get(host_id, constants.LARGE_INT)
+            if path_len < shortest_distance:
+                shortest_distance = path_len
 
         return shortest_distance
 
@@ -683,6 +875,7 @@ class Network:
                 if None then it only sorts by the exposed endpoints
         """
 
+        self.sync_topology()
         visible_network = self.get_hacker_visible_graph()
 
         non_exposed_endpoints = [
@@ -708,42 +901,54 @@ class Network:
         Returns:
             a list of the neighbors for the host.
         """
-        return list(self.graph.neighbors(host_id))
+        return self.topology.get_neighbors(host_id)
 
     def setup_network(self):
         """
         Using the generated graph, generates a host for each node on the graph.
         """
-        ip_addresses = []
+        ip_addresses = set()
 
         for host_id in self.nodes:
             node_os = Host.get_random_os()
             node_os_version = Host.get_random_os_version(node_os)
             node_ip = Host.get_random_address(existing_addresses=ip_addresses)
-            ip_addresses.append(node_ip)
-            self.graph.nodes[host_id]["host"] = Host(
-                node_os,
-                node_os_version,
+            ip_addresses.add(node_ip)
+            self.set_host(
                 host_id,
-                node_ip,
-                random.choices(self.users_list, k=self.users_per_host),
-                self,
-                self.service_generator,
+                Host(
+                    node_os,
+                    node_os_version,
+                    host_id,
+                    node_ip,
+                    random.choices(self.users_list, k=self.users_per_host),
+                    self,
+                    self.service_generator,
+                ),
             )
 
-    def get_hacker_visible_graph(self):
+    def set_host(self, host_id, host):
         """
-        Returns the Network graph that is visible to the hacker depending on the hosts that have already been compromised
+        Places a Host instance on a node of the network
 
+        Parameters:
+            host_id:
+                the node to place the host on
+            host:
+                the Host instance
         """
-        visible_hosts = []
-        for c_host in self.reachable:
-            visible_hosts = visible_hosts + list(self.graph.neighbors(c_host))
+        self.graph.nodes[host_id]["host"] = host
+        self.topology.set_host(host_id, host)
+        self._host_index[host_id] = host
 
-        visible_hosts = visible_hosts + self.reachable
-        visible_hosts = visible_hosts + self.exposed_endpoints
+    def get_hacker_visible_graph(self):
+        """
+        Returns the Network graph that is visible to the hacker depending on the hosts that have already been compromised
 
-        return self.graph.subgraph(list(set(visible_hosts)))
+        """
+        if self._visible_graph is None:
+            self._visible_graph = self.graph.subgraph(self._visible_hosts)
+        return self._visible_graph
 
     def get_host(self, host_id):
         """
@@ -756,7 +961,7 @@ class Network:
             the corresponding Host instance
         """
 
-        return self.graph.nodes.get(host_id, {}).get("host", None)
+        return self.topology.get_host(host_id)
 
     def get_total_vulns(self):
         return self.total_vulns
@@ -1,61 +1,183 @@
 import random
 import logging
+import numpy as np
 import mtdnetwork.data.constants as constants
 import pkg_resources
 import uuid
 
+OS_TYPE_INDEX = {os_type: i for i, os_type in enumerate(constants.OS_TYPES)}
+DEPENDENT_VULN_IDS = [
+    x for x in range(0, 101, int(100 * constants.VULN_PROB_DEPENDS_ON_OTHER_VULNS))
+]
 
-class Vulnerability:
-    def __init__(self, can_have_os_dependency=False, os_list=[]):
-        """
-        Creates a vulnerability that is assigned to a set of versions for a service.
 
-        complexity: if set to 1 then the vulnerability is trivial to exploit, 0 for being impossible
-        impact: if 1 then exploiting the vulnerability is the most severe, 0 for not doing anything
+class VulnerabilityCatalogue:
+    def __init__(
+        self,
+        complexity,
+        impact,
+        has_dependent_vulns,
+        dependent_vuln_id,
+        has_os_dependency,
+        os_mask,
+    ):
+        """
+        Stores every vulnerability generated for a simulation as columns of NumPy arrays,
+        a vulnerability is an index into the columns.
 
         Parameters:
-            can_have_os_dependency:
-                if True it means that the vulnerability does have the possibility that it can only be exploited if it is on a particular operating system
-            os_list:
-                a list of operating systems that the vulnerability can be on (depends on the service)
+            complexity:
+                the complexity of each vulnerability, 1 for easy, 0 for impossible
+            impact:
+                the impact of each vulnerability, 10 for complete compromise, 0 for nothing
+            has_dependent_vulns:
+                whether each vulnerability can only be exploited with another vulnerability
+            dependent_vuln_id:
+                the type of vulnerability each vulnerability depends on
+            has_os_dependency:
+                whether each vulnerability can only be fully exploited on particular operating systems
+            os_mask:
+                a boolean array of vulnerabilities by constants.OS_TYPES marking the operating systems
+                each OS dependent vulnerability can be fully exploited on
         """
-        # 1 for easy, 0 for impossible
-        # Change to fit distributions
-        self.complexity = (
-            constants.VULN_MIN_COMPLEXITY
-            + (1 - constants.VULN_MIN_COMPLEXITY) * random.random()
-        )
-        # 1 for complete compromise
-        # 0 for nothing
-        self.impact = random.random() * 10
+        self.id = str(uuid.uuid4())
+        self.complexity = np.asarray(complexity, dtype=float)
+        self.impact = np.asarray(impact, dtype=float)
         self.cvss = (self.complexity + self.impact) / 2
         self.exploitability = self.cvss / 5.5
-        self.exploit_attempt = 0
-        self.exploited = False
-        self.has_os_dependency = False
-        self.vuln_os_list = []
-        self.has_dependent_vulns = (
-            random.random() < constants.VULN_PROB_DEPENDS_ON_OTHER_VULNS
+        self.has_dependent_vulns = np.asarray(has_dependent_vulns, dtype=bool)
+        self.dependent_vuln_id = np.asarray(dependent_vuln_id, dtype=int)
+        self.has_os_dependency = np.asarray(has_os_dependency, dtype=bool)
+        self.os_mask = np.asarray(os_mask, dtype=bool).reshape(
+            -1, len(constants.OS_TYPES)
         )
-        self.dependent_vuln_id = random.choice(
-            [
-                x
-                for x in range(
-                    0, 101, int(100 * constants.VULN_PROB_DEPENDS_ON_OTHER_VULNS)
-                )
-            ]
+        self.exploited = np.zeros(len(self.complexity), dtype=bool)
+        self.exploit_attempt = np.zeros(len(self.complexity), dtype=int)
+        # the exploit time without the OS and exploited adjustments never changes
+        self.base_exploit_time = constants.ATTACK_DURATION["EXPLOIT_VULN"] * (
+            1 - self.complexity
+        )
+        # the RoA only changes when a vulnerability is exploited
+        self.roa = (self.complexity * self.impact) / self.base_exploit_time
+        # the RoA used for the initial statistics, before any exploit
+        self.initial_roa = (self.complexity * self.impact) / (
+            constants.VULN_MIN_EXPLOIT_TIME
+            + (constants.VULN_MAX_EXPLOIT_TIME - constants.VULN_MIN_EXPLOIT_TIME)
+            * (1 - self.complexity)
         )
-        self.dependent_vulns = []
+        self.vulnerabilities = [Vulnerability(self, i) for i in range(len(self))]
+        # the ServiceVulnerabilities of the service versions that have each vulnerability
+        self._service_vulns = [[] for _ in range(len(self))]
+
+    def __len__(self):
+        return len(self.complexity)
+
+    def add_service_vulns(self, service_vulns):
+        """
+        Indexes the ServiceVulnerabilities of a service version by its vulnerabilities
+        """
+        for vuln in service_vulns.vulnerabilities:
+            self._service_vulns[vuln.index].append(service_vulns)
+
+    def set_exploited(self, index, exploited):
+        """
+        Sets whether a vulnerability is exploited, updates its RoA and marks the service
+        versions that have it as stale
+        """
+        if self.exploited.item(index) == exploited:
+            return
+        self.exploited[index] = exploited
+        exploit_time = self.base_exploit_time.item(index)
+        if exploited:
+            exploit_time = exploit_time / 2
+        self.roa[index] = (
+            self.complexity.item(index) * self.impact.item(index)
+        ) / exploit_time
+        for service_vulns in self._service_vulns[index]:
+            service_vulns.stale = True
 
-        self.id = str(uuid.uuid4())
-        self.logger = logging.getLogger("vuln-{}".format(self.id))
-        if can_have_os_dependency and len(os_list) > 1:
-            if random.random() < constants.VULN_PROB_DEPENDS_ON_OS:
-                self.has_os_dependency = True
-                self.vuln_os_list = random.sample(
-                    os_list, k=random.randint(1, len(os_list) - 1)
-                )
-                # self.vuln_os_list = random.sample(os_list, k=random.randint(1, 2))
+
+class Vulnerability:
+    __slots__ = ("_catalogue", "index")
+
+    def __init__(self, catalogue, index):
+        """
+        A view of a vulnerability in a VulnerabilityCatalogue, it is assigned to a set of versions for a service.
+        The catalogue creates one view per vulnerability so views are compared by identity.
+
+        complexity: if set to 1 then the vulnerability is trivial to exploit, 0 for being impossible
+        impact: if 1 then exploiting the vulnerability is the most severe, 0 for not doing anything
+
+        Parameters:
+            catalogue:
+                the catalogue that stores the vulnerability
+            index:
+                the index of the vulnerability in the catalogue
+        """
+        self._catalogue = catalogue
+        self.index = index
+
+    @property
+    def id(self):
+        return "{}-{}".format(self._catalogue.id, self.index)
+
+    @property
+    def complexity(self):
+        return self._catalogue.complexity.item(self.index)
+
+    @property
+    def impact(self):
+        return self._catalogue.impact.item(self.index)
+
+    @property
+    def cvss(self):
+        return self._catalogue.cvss.item(self.index)
+
+    @property
+    def exploitability(self):
+        return self._catalogue.exploitability.item(self.index)
+
+    @exploitability.setter
+    def exploitability(self, value):
+        self._catalogue.exploitability[self.index] = value
+
+    @property
+    def exploit_attempt(self):
+        return self._catalogue.exploit_attempt.item(self.index)
+
+    @exploit_attempt.setter
+    def exploit_attempt(self, value):
+        self._catalogue.exploit_attempt[self.index] = value
+
+    @property
+    def exploited(self):
+        return self._catalogue.exploited.item(self.index)
+
+    @exploited.setter
+    def exploited(self, value):
+        self._catalogue.set_exploited(self.index, value)
+
+    @property
+    def has_os_dependency(self):
+        return self._catalogue.has_os_dependency.item(self.index)
+
+    @property
+    def vuln_os_list(self):
+        return [
+            os_type
+            for os_type, on_os in zip(
+                constants.OS_TYPES, self._catalogue.os_mask[self.index]
+            )
+            if on_os
+        ]
+
+    @property
+    def has_dependent_vulns(self):
+        return self._catalogue.has_dependent_vulns.item(self.index)
+
+    @property
+    def dependent_vuln_id(self):
+        return self._catalogue.dependent_vuln_id.item(self.index)
 
     def to_json(self):
         return {
@@ -74,6 +196,9 @@ class Vulnerability:
     def get_id(self):
         return self.id
 
+    def get_catalogue(self):
+        return self._catalogue
+
     def can_exploit_with_dependent_vuln(self, vulns):
         """
         Checks if there is another vulnerability that the adversary can exploit which enables this vulnerability
@@ -99,14 +224,15 @@ class Vulnerability:
             the more attempts a hacker tries at exploiting a particular vulnerability the faster the exploit time becomes
 
         """
-        exp_time = constants.ATTACK_DURATION["EXPLOIT_VULN"] * (1 - self.complexity)
+        catalogue = self._catalogue
+        exp_time = catalogue.base_exploit_time.item(self.index)
         if (
-            self.has_os_dependency
-            and host is not None
-            and host.os_type not in self.vuln_os_list
+            host is not None
+            and catalogue.has_os_dependency.item(self.index)
+            and not catalogue.os_mask[self.index, OS_TYPE_INDEX[host.os_type]]
         ):
             exp_time *= 2.5
-        if self.exploited:
+        if catalogue.exploited.item(self.index):
             return exp_time / 2
         return exp_time
         # return constants.VULN_MIN_EXPLOIT_TIME + (constants.VULN_MAX_EXPLOIT_TIME -
@@ -133,7 +259,7 @@ class Vulnerability:
         if random.random() < self.complexity:
             self.exploited = True
             if self.has_os_dependency:
-                self.logger.info("OS DEPENDENT VULNERABILITY EXPLOITED!")
+                logging.info("OS DEPENDENT VULNERABILITY EXPLOITED!")
             return self.impact
         return 0.0
 
@@ -166,45 +292,117 @@ class Vulnerability:
         This version uses the exploit_time as the attack cost.
 
         The x100 is because impact is expressed as a value 1-10 on CVE
+
+        The RoA is kept in the catalogue and only recalculated when the vulnerability is exploited
         """
-        return (self.complexity * self.impact) / self.exploit_time()
+        return self._catalogue.roa.item(self.index)
 
     def initial_roa(self):
-        return (self.complexity * self.impact) / (
-            constants.VULN_MIN_EXPLOIT_TIME
-            + (constants.VULN_MAX_EXPLOIT_TIME - constants.VULN_MIN_EXPLOIT_TIME)
-            * (1 - self.complexity)
-        )
+        return self._catalogue.initial_roa.item(self.index)
 
-    def __eq__(self, other):
+
+class ServiceVulnerabilities:
+    __slots__ = ("vulnerabilities", "stale", "_unexploited", "_exploited_impact")
+
+    def __init__(self, vulnerabilities):
+        """
+        The vulnerabilities of a service version from the highest RoA, shared by the copies of
+        the service. The catalogue marks it as stale when one of its vulnerabilities is exploited.
+
+        Parameters:
+            vulnerabilities:
+                the vulnerabilities sorted from the highest RoA
         """
-        Checks if two instances a Vulnerability are equal
+        self.vulnerabilities = vulnerabilities
+        self.stale = True
+        self._unexploited = None
+        self._exploited_impact = 0
+        if len(vulnerabilities) > 0:
+            vulnerabilities[0].get_catalogue().add_service_vulns(self)
+
+    def _update(self):
         """
-        if not isinstance(other, Vulnerability):
-            return False
-        return other.id == self.id
+        Refilters the unexploited vulnerabilities and resums the impact of the exploited ones,
+        only after one of them has been exploited
+        """
+        if not self.stale:
+            return
+        self._unexploited = []
+        self._exploited_impact = 0
+        for vuln in self.vulnerabilities:
+            if vuln.is_exploited():
+                self._exploited_impact += vuln.impact
+            else:
+                self._unexploited.append(vuln)
+        self.stale = False
+
+    def get_unexploited(self):
+        """
+        Returns:
+            the vulnerabilities that have not been exploited yet in order of RoA
+        """
+        self._update()
+        return self._unexploited
+
+    def get_exploited_impact(self):
+        """
+        Returns:
+            the total impact of the exploited vulnerabilities
+        """
+        self._update()
+        return self._exploited_impact
 
 
 class Service:
-    def __init__(self, service_name, service_version, vulnerabilities):
+    __slots__ = (
+        "name",
+        "version",
+        "vulnerabilities",
+        "exploit_value",
+        "_id",
+        "_vulns",
+    )
+
+    def __init__(
+        self, service_name, service_version, vulnerabilities, sorted_by_roa=False
+    ):
         """
         Creates a Service instance that are assigned to Hosts
 
+        Copies of a service share the name, version and ServiceVulnerabilities, which are never
+        modified, each copy only holds its own exploit value and id.
+
         Parameters:
             service_name:
                 the name of the service
             service_version:
                 the version of the service
             vulnerabilities:
-                a list of the vulnerabilities that are on the service
+                a list of the vulnerabilities that are on the service, or the
+                ServiceVulnerabilities of the service being copied
+            sorted_by_roa:
+                True if the vulnerabilities are already sorted from the highest RoA
         """
         self.name = service_name
         self.version = service_version
-        self.vulnerabilities: list[Vulnerability] = sorted(
-            vulnerabilities, key=lambda v: v.roa(), reverse=True
-        )
+        if isinstance(vulnerabilities, ServiceVulnerabilities):
+            self._vulns = vulnerabilities
+        else:
+            if not sorted_by_roa:
+                vulnerabilities = sorted(
+                    vulnerabilities, key=lambda v: v.roa(), reverse=True
+                )
+            self._vulns = ServiceVulnerabilities(vulnerabilities)
+        self.vulnerabilities: list[Vulnerability] = self._vulns.vulnerabilities
         self.exploit_value = 0.0
-        self.id = str(uuid.uuid4())
+        self._id = None
+
+    @property
+    def id(self):
+        # the id is only generated for services that are looked up by id
+        if self._id is None:
+            self._id = str(uuid.uuid4())
+        return self._id
 
     def to_json(self):
         return {
@@ -220,18 +418,23 @@ class Service:
         Returns:
             a copy of this service instance
         """
-        return Service(self.name, self.version, [v for v in self.vulnerabilities])
+        return Service(self.name, self.version, self._vulns)
 
     def get_vulns(self, roa_threshold=0):
         """
         Returns:
             the top X vulnerabilities in terms of RoA of the service that have not been exploited yet
         """
-        return [
-            v
-            for v in self.vulnerabilities
-            if v.roa() > roa_threshold and not v.is_exploited()
-        ][: constants.SERVICE_TOP_X_VULNS_TO_RETURN]
+        return [v for v in self.get_unexploited_vulns() if v.roa() > roa_threshold][
+            : constants.SERVICE_TOP_X_VULNS_TO_RETURN
+        ]
+
+    def get_unexploited_vulns(self):
+        """
+        Returns:
+            the vulnerabilities that have not been exploited yet in order of RoA
+        """
+        return self._vulns.get_unexploited()
 
     def get_all_vulns(self):
         return self.vulnerabilities
@@ -240,10 +443,7 @@ class Service:
         return self.id
 
     def is_exploited(self):
-        self.exploit_value = 0
-        for vuln in self.vulnerabilities:
-            if vuln.exploited:
-                self.exploit_value += vuln.impact
+        self.exploit_value = self._vulns.get_exploited_impact()
         return self.exploit_value > constants.SERVICE_COMPROMISED_THRESHOLD
 
     def discover_vuln_time(self, roa_threshold=0):
@@ -253,10 +453,10 @@ class Service:
         )
 
     def get_highest_roa_vuln(self):
-        vuln_len = len(self.get_vulns())
-        if vuln_len < 1:
+        vulns = self.get_vulns()
+        if len(vulns) < 1:
             return 0.0
-        return self.get_vulns()[0].roa()
+        return vulns[0].roa()
 
     def __eq__(self, other):
         if not isinstance(other, Service):
@@ -264,6 +464,47 @@ class Service:
         return other.name == self.name and other.version == self.version
 
 
+class ServiceTable:
+    def __init__(self):
+        """
+        Collects the service versions and vulnerabilities of serialized services so that each
+        is only serialized once. Copies of a service share their vulnerability list, so a
+        service version is identified by the list.
+        """
+        self.service_versions = {}
+        self.vulnerabilities = {}
+        # the vulnerability list of each service version by its id(), the lists are kept
+        # so an id() is never reused while the table is alive
+        self._version_ids = {}
+
+    def to_json(self, service):
+        """
+        Returns:
+            the JSON of the service, with its version referenced by an id into service_versions
+        """
+        version_id, _ = self._version_ids.get(id(service.vulnerabilities), (None, None))
+        if version_id is None:
+            version_id = str(len(self._version_ids))
+            self._version_ids[id(service.vulnerabilities)] = (
+                version_id,
+                service.vulnerabilities,
+            )
+            for v in service.vulnerabilities:
+                if v.id not in self.vulnerabilities:
+                    self.vulnerabilities[v.id] = v.to_json()
+            self.service_versions[version_id] = {
+                "name": service.name,
+                "version": service.version,
+                "vulnerabilities": [v.id for v in service.vulnerabilities],
+            }
+
+        return {
+            "serviceVersion": version_id,
+            "exploitValue": service.exploit_value,
+            "id": service.id,
+        }
+
+
 class ServicesGenerator:
     def __init__(
         self,
@@ -299,6 +540,7 @@ class ServicesGenerator:
         """
         self.services = None
         self.service_names = None
+        self.vulnerabilities = None
         self.os_services = None
         self.services_per_os = services_per_os
         self.percent_cross_platform = percent_cross_platform
@@ -378,6 +620,9 @@ class ServicesGenerator:
         s_versions_len = len(s_versions)
 
         self.services = {}
+        # the random properties of every vulnerability, the catalogue is built from them once all are drawn
+        vuln_rows = []
+        service_vulns = []
         # os_list = constants.OS_TYPES
         for s_index, service in enumerate(self.service_names):
             os_list = [constants.OS_TYPES[s_index // self.services_per_os]]
@@ -388,7 +633,6 @@ class ServicesGenerator:
             # can_have_os_depend_vuln = len(os_list) > 1
             can_have_os_depend_vuln = True
 
-            self.services[service] = []
             vulns = {}
 
             # Code for vulnerability generation, commented out double generation from original code
@@ -397,14 +641,30 @@ class ServicesGenerator:
                     vuln_patch_dist = i + random.randint(
                         -self.vuln_patch_range, self.vuln_patch_range
                     )
-                    vulns[vuln_patch_dist] = Vulnerability(
+                    vulns[vuln_patch_dist] = ServicesGenerator.draw_vulnerability(
                         can_have_os_dependency=can_have_os_depend_vuln, os_list=os_list
                     )
 
             # Adding Vuln at version 99 to ensure there is a vuln in every version
-            vulns[99] = Vulnerability(
+            vulns[99] = ServicesGenerator.draw_vulnerability(
                 can_have_os_dependency=can_have_os_depend_vuln, os_list=os_list
             )
+
+            # vulnerabilities are stored latest patched first so those active on a version are a range
+            patch_dists = sorted(vulns, reverse=True)
+            service_vulns.append((service, os_list, len(vuln_rows), patch_dists))
+            vuln_rows.extend(vulns[patch_dist] for patch_dist in patch_dists)
+
+        self.vulnerabilities = VulnerabilityCatalogue(*zip(*vuln_rows))
+        vulns_roa = self.vulnerabilities.roa
+
+        for service, os_list, start, patch_dists in service_vulns:
+            self.services[service] = []
+            stop = start + len(patch_dists)
+            # indices of the vulnerabilities of the service from the highest RoA
+            roa_order = (
+                start + np.argsort(-vulns_roa[start:stop], kind="stable")
+            ).tolist()
             for sv_index in range(s_versions_len):
                 service_version = s_versions[sv_index]
                 # version_scale = (s_versions_len - sv_index)/s_versions_len
@@ -416,9 +676,15 @@ class ServicesGenerator:
                 #         os_list=os_list
                 #     )
 
-                active_vulns = [vulns[i] for i in vulns if i >= sv_index]
+                while patch_dists[stop - start - 1] < sv_index:
+                    stop -= 1
+                active_vulns = [
+                    self.vulnerabilities.vulnerabilities[i]
+                    for i in roa_order
+                    if i < stop
+                ]
                 self.services[service] = self.services[service] + [
-                    Service(service, service_version, active_vulns)
+                    Service(service, service_version, active_vulns, sorted_by_roa=True)
                 ]
 
             for os_name in os_list:
@@ -433,6 +699,52 @@ class ServicesGenerator:
                     ]
                     self.os_services[os_name][os_version][service] = service_versions
 
+    @staticmethod
+    def draw_vulnerability(can_have_os_dependency=False, os_list=[]):
+        """
+        Draws the random properties of a vulnerability that is assigned to a set of versions for a service.
+
+        Parameters:
+            can_have_os_dependency:
+                if True it means that the vulnerability does have the possibility that it can only be exploited if it is on a particular operating system
+            os_list:
+                a list of operating systems that the vulnerability can be on (depends on the service)
+
+        Returns:
+            a row of the VulnerabilityCatalogue columns
+        """
+        # 1 for easy, 0 for impossible
+        # Change to fit distributions
+        complexity = (
+            constants.VULN_MIN_COMPLEXITY
+            + (1 - constants.VULN_MIN_COMPLEXITY) * random.random()
+        )
+        # 1 for complete compromise
+        # 0 for nothing
+        impact = random.random() * 10
+        has_dependent_vulns = (
+            random.random() < constants.VULN_PROB_DEPENDS_ON_OTHER_VULNS
+        )
+        dependent_vuln_id = random.choice(DEPENDENT_VULN_IDS)
+        has_os_dependency = False
+        os_mask = [False] * len(constants.OS_TYPES)
+        if can_have_os_dependency and len(os_list) > 1:
+            if random.random() < constants.VULN_PROB_DEPENDS_ON_OS:
+                has_os_dependency = True
+                vuln_os_list = random.sample(
+                    os_list, k=random.randint(1, len(os_list) - 1)
+                )
+                for os_type in vuln_os_list:
+                    os_mask[OS_TYPE_INDEX[os_type]] = True
+        return (
+            complexity,
+            impact,
+            has_dependent_vulns,
+            dependent_vuln_id,
+            has_os_dependency,
+            os_mask,
+        )
+
     @staticmethod
     def get_service_name_list():
         return [
@@ -444,3 +756,6 @@ class ServicesGenerator:
 
     def get_all_generated_services(self):
         return self.os_services
+
+    def get_vulnerability_catalogue(self):
+        return self.vulnerabilities
@@ -29,8 +29,10 @@ class TargetNetwork(Network):
         self.network_type = 0
 
         self.graph = network.get_graph_copy().copy()
+        self.index_graph()
         self.colour_map = network.get_colourmap()
-        self.pos = network.get_pos()
+        self.subnet_nodes = network.subnet_nodes
+        self.headless = network.headless
         self.node_per_layer = network.get_node_per_layer()
         self.users_list = network.get_users_list()
         self.users_per_host = network.get_users_per_host()
@@ -1,9 +1,13 @@
+import numpy as np
 from scipy.stats import expon
 from scipy.stats import norm
 from scipy.stats import uniform
 from scipy.stats import weibull_min
 from scipy.stats import poisson
 
+# number of variates drawn from the generator each time a block runs out
+VARIATE_BLOCK_SIZE = 4096
+
 
 def exponential_variates(loc, scale):
     return expon.rvs(loc=loc, scale=scale, size=1)[0]
@@ -23,3 +27,30 @@ def weibull_variates(loc, scale):
 
 def poisson_variates(loc, scale):
     return poisson.rvs(loc=loc, scale=scale, size=1)[0]
+
+
+class VariateStream:
+    def __init__(self, seed=None, block_size=VARIATE_BLOCK_SIZE):
+        """
+        Hands out exponential variates one at a time from blocks pre-drawn with a NumPy Generator.
+
+        Standard exponential variates are drawn in blocks of block_size and refilled lazily,
+        location and scale are applied when a value is handed out.
+
+        Parameters:
+            seed:
+                the seed for the generator. If None the generator is seeded with fresh
+                entropy from the operating system, never from the global NumPy random state
+            block_size:
+                the number of variates drawn each time a block runs out
+        """
+        self._rng = np.random.default_rng(seed)
+        self._block_size = block_size
+        self._exponential_block = []
+
+    def exponential(self, loc, scale):
+        if not self._exponential_block:
+            self._exponential_block = self._rng.standard_exponential(
+                self._block_size
+            ).tolist()
+        return loc + scale * self._exponential_block.pop()
@@ -15,6 +15,7 @@ class TimeNetwork(Network):
         total_database=5,
         # terminate_compromise_ratio=0.8,
         seed=None,
+        headless=False,
     ):
         # default parameters
         self._mtd_stats = MTDStatistics()
@@ -31,6 +32,7 @@ class TimeNetwork(Network):
             target_layer=target_layer,
             total_database=total_database,
             seed=seed,
+            headless=headless,
         )
         self.init_network()
 
@@ -38,21 +40,24 @@ class TimeNetwork(Network):
         """
         Using the generated graph, generates a host for each node on the graph.
         """
-        ip_addresses = []
+        ip_addresses = set()
 
         for host_id in self.nodes:
             node_os = Host.get_random_os()
             node_os_version = Host.get_random_os_version(node_os)
             node_ip = Host.get_random_address(existing_addresses=ip_addresses)
-            ip_addresses.append(node_ip)
-            self.graph.nodes[host_id]["host"] = Host(
-                node_os,
-                node_os_version,
+            ip_addresses.add(node_ip)
+            self.set_host(
                 host_id,
-                node_ip,
-                random.choices(self.users_list, k=self.users_per_host),
-                self,
-                self.service_generator,
+                Host(
+                    node_os,
+                    node_os_version,
+                    host_id,
+                    node_ip,
+                    random.choices(self.users_list, k=self.users_per_host),
+                    self,
+                    self.service_generator,
+                ),
             )
 
     def is_compromised(self, compromised_hosts):
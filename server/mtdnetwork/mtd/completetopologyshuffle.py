@@ -20,7 +20,7 @@ class CompleteTopologyShuffle(MTD):
         # Regenerate the network graph
         self.network.gen_graph()
         for host_id, host_instance in hosts.items():
-            self.network.graph.nodes[host_id]["host"] = host_instance
+            self.network.set_host(host_id, host_instance)
         self.network.update_reachable_mtd()
 
         # Update Attack Path Exposure for target networks
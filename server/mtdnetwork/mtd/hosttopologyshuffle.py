@@ -29,16 +29,19 @@ class HostTopologyShuffle(MTD):
         layer_dict = self.network.get_layers()
         cur_layer = -1
         exposed_endpoints = self.network.exposed_endpoints
-        seen = []
+        seen = set()
         host_id_list_in_layer = []
 
+        hosts_by_layer = {}
+        for host in hosts:
+            hosts_by_layer.setdefault(layer_dict[host], []).append(host)
+
         for host_id, host_instance in hosts.items():
             if layer_dict[host_id] != cur_layer:
                 cur_layer = layer_dict[host_id]
-                host_id_list_in_layer = []
-                for host in hosts:
-                    if layer_dict[host] == cur_layer and host not in seen:
-                        host_id_list_in_layer.append(host)
+                host_id_list_in_layer = [
+                    host for host in hosts_by_layer[cur_layer] if host not in seen
+                ]
             if host_id in seen or host_id in exposed_endpoints:
                 continue
             if len(host_id_list_in_layer) == 1:
@@ -53,17 +56,17 @@ class HostTopologyShuffle(MTD):
             host_instance.host_id = other_host_id
             other_host_instance.host_id = host_id
 
-            self.network.graph.nodes[host_id]["host"] = other_host_instance
-            self.network.graph.nodes[other_host_id]["host"] = host_instance
+            self.network.set_host(host_id, other_host_instance)
+            self.network.set_host(other_host_id, host_instance)
 
-            seen.append(host_id)
-            seen.append(other_host_id)
+            seen.add(host_id)
+            seen.add(other_host_id)
             host_id_list_in_layer.remove(host_id)
             host_id_list_in_layer.remove(other_host_id)
 
             adversary.swap_hosts_in_compromised_hosts(host_id, other_host_id)
 
-        self.network.update_reachable_mtd()
+        self.network.update_reachable_mtd(adversary.get_compromised_hosts())
 
         # Update Attack Path Exposure for target networks
         if self.network.get_network_type() == 0:
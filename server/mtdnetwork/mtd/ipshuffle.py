@@ -17,10 +17,10 @@ class IPShuffle(MTD):
         '''Method shuffles hosts of network'''
         hosts = self.network.get_hosts()
 
-        ip_addresses = []
+        ip_addresses = set()
         for host_id, host_instance in hosts.items():
             if host_id in self.network.exposed_endpoints:
                 continue
             host_ip = host.Host.get_random_address(existing_addresses=ip_addresses)
-            ip_addresses.append(host_ip)
+            ip_addresses.add(host_ip)
             host_instance.ip = host_ip
@@ -36,14 +36,15 @@ class OSDiversity(MTD):
                 if node_id == host_instance.target_node:
                     continue
 
-                curr_service = host_instance.graph.nodes[node_id]["service"]
+                curr_service = host_instance.get_service(node_id)
                 if not service_generator.service_is_compatible_with_os(
                     new_os, new_os_version, curr_service
                 ):
-                    host_instance.graph.nodes[node_id][
-                        "service"
-                    ] = service_generator.get_random_service_latest_version(
-                        host_instance.os_type, host_instance.os_version
+                    host_instance.set_service(
+                        node_id,
+                        service_generator.get_random_service_latest_version(
+                            host_instance.os_type, host_instance.os_version
+                        ),
                     )
         # Update Attack Path Exposure for target networks
         if self.network.get_network_type() == 0:
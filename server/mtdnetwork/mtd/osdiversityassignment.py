@@ -67,14 +67,15 @@ class OSDiversityAssignment(MTD):
             for node_id in range(host_instance.total_nodes):
                 if node_id == host_instance.target_node:
                     continue
-                curr_service = host_instance.graph.nodes[node_id]["service"]
+                curr_service = host_instance.get_service(node_id)
                 if not service_generator.service_is_compatible_with_os(
                     new_os, new_os_version, curr_service
                 ):
-                    host_instance.graph.nodes[node_id][
-                        "service"
-                    ] = service_generator.get_random_service_latest_version(
-                        host_instance.os_type, host_instance.os_version
+                    host_instance.set_service(
+                        node_id,
+                        service_generator.get_random_service_latest_version(
+                            host_instance.os_type, host_instance.os_version
+                        ),
                     )
 
     def get_name(self):
@@ -100,7 +101,7 @@ class DiversityAssignment:
         self.os_types = os_types
         self._pos = pos
         self._colour_map = colour_map
-        self.total_nodes = len(self._pos)
+        self.total_nodes = len(self._graph)
         self.flag = False
 
     def gen_single_connection_graph(self):
@@ -27,4 +27,4 @@ class PortShuffle(MTD):
                     continue
                 new_port = host.Host.get_random_port(existing_ports=new_ports)
                 new_ports.append(new_port)
-                host_instance.graph.nodes[node_id]["port"] = new_port
+                host_instance.set_port(node_id, new_port)
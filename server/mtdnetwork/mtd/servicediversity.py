@@ -25,10 +25,11 @@ class ServiceDiversity(MTD):
             for node_id in range(host_instance.total_nodes):
                 if node_id == host_instance.target_node:
                     continue
-                host_instance.graph.nodes[node_id][
-                    "service"
-                ] = service_generator.get_random_service_latest_version(
-                    host_instance.os_type, host_instance.os_version
+                host_instance.set_service(
+                    node_id,
+                    service_generator.get_random_service_latest_version(
+                        host_instance.os_type, host_instance.os_version
+                    ),
                 )
         # Update Attack Path Exposure for target networks
         if self.network.get_network_type() == 0:
@@ -1,17 +1,18 @@
 import simpy
 import logging
 import random
-from mtdnetwork.component.time_generator import exponential_variates
-from mtdnetwork.data.constants import ATTACK_DURATION
+from mtdnetwork.component.time_generator import VariateStream
+from mtdnetwork.data.constants import ATTACK_DURATION, LARGE_INT
 
 
 class AttackOperation:
-    def __init__(self, env, end_event, adversary, proceed_time=0):
+    def __init__(self, env, end_event, adversary, proceed_time=0, variates=None):
         """
 
         :param env: the parameter to facilitate simPY env framework
         :param adversary: the simulation attacker
         :param proceed_time: the time to proceed attack simulation
+        :param variates: the VariateStream to draw random time durations from
         """
 
         self.env = env
@@ -20,6 +21,9 @@ class AttackOperation:
         self._attack_process = None
         self._interrupted_mtd = None
         self._proceed_time = proceed_time
+        if variates is None:
+            variates = VariateStream()
+        self._variates = variates
 
     def proceed_attack(self):
         if self.adversary.get_curr_process() == "SCAN_HOST":
@@ -103,7 +107,6 @@ class AttackOperation:
         """
         raise an EXPLOIT_VULN action
         """
-        # exploit_time = exponential_variates(ATTACK_DURATION['EXPLOIT_VULN'][0], ATTACK_DURATION['EXPLOIT_VULN'][1])
         adversary = self.adversary
         adversary.set_curr_vulns(
             adversary.get_curr_host().get_vulns(adversary.get_curr_ports())
@@ -150,7 +153,9 @@ class AttackOperation:
             self._interrupted_mtd,
         )
         # confusion penalty caused by MTD operation
-        yield self.env.timeout(exponential_variates(ATTACK_DURATION["PENALTY"], 0.5))
+        yield self.env.timeout(
+            self._variates.exponential(ATTACK_DURATION["PENALTY"], 0.5)
+        )
 
         if self._interrupted_mtd.get_resource_type() == "network":
             self._interrupted_mtd = None
@@ -179,39 +184,39 @@ class AttackOperation:
         """
         adversary = self.adversary
         compromised_hosts = adversary.get_compromised_hosts()
+        is_host_compromised = adversary.is_host_compromised
         stop_attack = adversary.get_stop_attack()
         network = adversary.get_network()
 
         adversary.set_pivot_host_id(-1)
         visible_network = network.get_hacker_visible_graph()
+        exposed_endpoints = set(network.exposed_endpoints)
         # scan_time = constants.NETWORK_HOST_DISCOVER_TIME * visible_network.number_of_nodes()
         uncompromised_hosts = []
         # Add every uncompromised host that is reachable and is not an exposed or compromised host
         for c_host in compromised_hosts:
-            uncompromised_hosts = uncompromised_hosts + [
+            uncompromised_hosts.extend(
                 neighbor
-                for neighbor in network.graph.neighbors(c_host)
-                if neighbor not in compromised_hosts
-                and neighbor not in network.exposed_endpoints
-                and len(
-                    network.get_path_from_exposed(neighbor, graph=visible_network)[0]
-                )
-                > 0
-            ]
+                for neighbor in network.get_neighbors(c_host)
+                if not is_host_compromised(neighbor)
+                and neighbor not in exposed_endpoints
+                and network.get_distance_from_exposed(neighbor, graph=visible_network)
+                != LARGE_INT
+            )
 
         # Add random element from 0 to 1 so the scan does not return the same order of hosts each time for the hacker
         uncompromised_hosts = sorted(
             uncompromised_hosts,
-            key=lambda host_id: network.get_path_from_exposed(
+            key=lambda host_id: network.get_distance_from_exposed(
                 host_id, graph=visible_network
-            )[1]
+            )
             + random.random(),
         )
 
         uncompromised_hosts = uncompromised_hosts + [
             ex_node
             for ex_node in network.exposed_endpoints
-            if ex_node not in compromised_hosts
+            if not is_host_compromised(ex_node)
         ]
         discovered_hosts = [n for n in uncompromised_hosts if n not in stop_attack]
 
@@ -238,7 +243,7 @@ class AttackOperation:
                 pivot_host_id=adversary.get_pivot_host_id(),
             )
         )
-        adversary.set_curr_host_id(adversary.get_host_stack().pop(0))
+        adversary.set_curr_host_id(adversary.get_host_stack().popleft())
         adversary.set_curr_host(network.get_host(adversary.get_curr_host_id()))
         # Sets node as unattackable if has been attack too many times
         adversary.get_attack_counter()[adversary.get_curr_host_id()] += 1
@@ -251,7 +256,7 @@ class AttackOperation:
                 adversary.get_curr_host_id() != network.get_target_node()
                 and network.network_type == 0
             ):
-                adversary.get_stop_attack().append(adversary.get_curr_host_id())
+                adversary.get_stop_attack().add(adversary.get_curr_host_id())
 
         # Checks if max attack attempts has been reached, empty stacks if reached
         # if adversary.get_curr_attempts() >= adversary.get_max_attack_attempts():
@@ -297,7 +302,7 @@ class AttackOperation:
         """
         adversary = self.adversary
         for vuln in vulns:
-            exploit_time = exponential_variates(
+            exploit_time = self._variates.exponential(
                 vuln.exploit_time(host=adversary.get_curr_host()), 0.5
             )
             start_time = self.env.now + self._proceed_time
@@ -377,10 +382,11 @@ class AttackOperation:
         """
         adversary = self.adversary
         found_neighbors = adversary.get_curr_host().discover_neighbors()
+        found_neighbor_set = set(found_neighbors)
         new__host_stack = found_neighbors + [
             node_id
             for node_id in adversary.get_host_stack()
-            if node_id not in found_neighbors
+            if node_id not in found_neighbor_set
         ]
         adversary.set_host_stack(new__host_stack)
         self._enum_host()
@@ -397,7 +403,7 @@ class AttackOperation:
         if adversary.get_pivot_host_id() in neighbors:
             return
         for n in neighbors:
-            if n in adversary.get_compromised_hosts():
+            if adversary.is_host_compromised(n):
                 adversary.set_pivot_host_id(n)
                 return
         adversary.set_pivot_host_id(-1)
@@ -408,8 +414,8 @@ class AttackOperation:
         """
         adversary = self.adversary
         adversary._pivot_host_id = adversary.get_curr_host_id()
-        if adversary.get_curr_host_id() not in adversary.get_compromised_hosts():
-            adversary.get_compromised_hosts().append(adversary.get_curr_host_id())
+        if not adversary.is_host_compromised(adversary.get_curr_host_id()):
+            adversary.add_compromised_host(adversary.get_curr_host_id())
             adversary.get_attack_stats().update_compromise_host(adversary.curr_host)
             logging.info(
                 "Adversary: Host %i has been compromised at %.1fs!"
@@ -422,11 +428,8 @@ class AttackOperation:
             for user in adversary.get_curr_host().get_compromised_users():
                 if user not in adversary.get_compromised_users():
                     adversary.get_attack_stats().update_compromise_user(user)
-            adversary._compromised_users = list(
-                set(
-                    adversary.get_compromised_users()
-                    + adversary.get_curr_host().get_compromised_users()
-                )
+            adversary.add_compromised_users(
+                adversary.get_curr_host().get_compromised_users()
             )
             if adversary.get_network().is_compromised(
                 adversary.get_compromised_hosts()
@@ -1,4 +1,4 @@
-from mtdnetwork.component.time_generator import exponential_variates
+from mtdnetwork.component.time_generator import VariateStream
 import logging
 import simpy
 from mtdnetwork.component.mtd_scheme import MTDScheme
@@ -15,6 +15,7 @@ class MTDOperation:
         proceed_time=0,
         mtd_trigger_interval=None,
         custom_strategies=None,
+        variates=None,
     ):
         """
 
@@ -24,6 +25,7 @@ class MTDOperation:
         :param scheme:alternatively, simultaneously, randomly
         :param proceed_time:the time to proceed MTD simulation
         :param custom_strategies:specific MTD priority strategy for alternative scheme or single scheme
+        :param variates: the VariateStream to draw random time durations from
         """
         self.env = env
         self.end_event = end_event
@@ -37,6 +39,9 @@ class MTDOperation:
             custom_strategies=custom_strategies,
         )
         self._proceed_time = proceed_time
+        if variates is None:
+            variates = VariateStream()
+        self._variates = variates
 
         self.application_layer_resource = simpy.Resource(self.env, 1)
         self.network_layer_resource = simpy.Resource(self.env, 1)
@@ -92,7 +97,7 @@ class MTDOperation:
 
             # exponential time interval for triggering MTD operations
             yield self.env.timeout(
-                exponential_variates(
+                self._variates.exponential(
                     self._mtd_scheme.get_mtd_trigger_interval(),
                     self._mtd_scheme.get_mtd_trigger_std(),
                 )
@@ -153,7 +158,7 @@ class MTDOperation:
 
             # exponential distribution for triggering MTD operations
             yield self.env.timeout(
-                exponential_variates(
+                self._variates.exponential(
                     self._mtd_scheme.get_mtd_trigger_interval(),
                     self._mtd_scheme.get_mtd_trigger_std(),
                 )
@@ -172,7 +177,7 @@ class MTDOperation:
             "MTD: %s deployed in the network at %.1fs." % (mtd.get_name(), start_time)
         )
         yield env.timeout(
-            exponential_variates(
+            self._variates.exponential(
                 mtd.get_execution_time_mean(), mtd.get_execution_time_std()
             )
         )
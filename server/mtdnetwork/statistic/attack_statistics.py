@@ -1,12 +1,32 @@
 '''Module for managing and recording data from attack operations'''
 import os
-import pandas as pd
+import numpy as np
+from mtdnetwork.statistic.record_buffer import RecordBuffer, CATEGORY
 
 
 class AttackStatistics:
     '''Class for recording attack data'''
     def __init__(self):
-        self._attack_operation_record = []
+        self._attack_operation_record = RecordBuffer(
+            {
+                "name": CATEGORY,
+                "start_time": np.float64,
+                "finish_time": np.float64,
+                "duration": np.float64,
+                "current_host": np.int64,
+                "current_host_uuid": object,
+                "compromise_host": object,
+                "compromise_host_uuid": object,
+                "current_host_attempt": np.int64,
+                "cumulative_attempts": np.int64,
+                "cumulative_compromised_hosts": np.int64,
+                "interrupted_in": CATEGORY,
+                "interrupted_by": CATEGORY,
+            }
+        )
+        # most attack actions compromise no users, so the users are only kept for the
+        # records that have some, by record index
+        self._compromise_users = {}
 
     def append_attack_operation_record(
         self, name, start_time, finish_time, adversary, interrupted_mtd=None
@@ -23,45 +43,53 @@ class AttackStatistics:
             uuid = adversary.get_curr_host().uuid
 
         self._attack_operation_record.append(
-            {
-                "name": name,
-                "start_time": start_time,
-                "finish_time": finish_time,
-                "duration": duration,
-                "current_host": adversary.get_curr_host_id(),
-                "current_host_uuid": uuid,
-                "compromise_host": "None",
-                "compromise_host_uuid": "None",
-                "current_host_attempt": adversary.get_attack_counter()[
-                    adversary.get_curr_host_id()
-                ],
-                "cumulative_attempts": adversary.get_curr_attempts(),
-                "cumulative_compromised_hosts": len(adversary.get_compromised_hosts()),
-                "compromise_users": [],
-                "interrupted_in": interrupted_in,
-                "interrupted_by": interrupted_by,
-            }
+            name=name,
+            start_time=start_time,
+            finish_time=finish_time,
+            duration=duration,
+            current_host=adversary.get_curr_host_id(),
+            current_host_uuid=uuid,
+            compromise_host="None",
+            compromise_host_uuid="None",
+            current_host_attempt=adversary.get_attack_counter()[
+                adversary.get_curr_host_id()
+            ],
+            cumulative_attempts=adversary.get_curr_attempts(),
+            cumulative_compromised_hosts=len(adversary.get_compromised_hosts()),
+            interrupted_in=interrupted_in,
+            interrupted_by=interrupted_by,
         )
 
     def update_compromise_host(self, curr_host):
         '''Method to update compromise host field with current host fields'''
-        self._attack_operation_record[-1]["compromise_host"] = curr_host.host_id
-        self._attack_operation_record[-1]["compromise_host_uuid"] = curr_host.uuid
+        self._attack_operation_record.set_last("compromise_host", curr_host.host_id)
+        self._attack_operation_record.set_last("compromise_host_uuid", curr_host.uuid)
 
     def update_compromise_user(self, user):
         '''Method to update compromise user field with most recent attack data'''
-        self._attack_operation_record[-1]["compromise_users"].append(user)
+        index = len(self._attack_operation_record) - 1
+        self._compromise_users.setdefault(index, []).append(user)
 
     def get_record(self):
         '''Method returns attack operation record as pandas dataframe'''
-        return pd.DataFrame(self._attack_operation_record)
+        record = self._attack_operation_record.to_frame()
+        compromise_users = np.empty(len(record), dtype=object)
+        compromise_users[:] = [
+            self._compromise_users.get(index, []) for index in range(len(record))
+        ]
+        record.insert(
+            record.columns.get_loc("interrupted_in"),
+            "compromise_users",
+            compromise_users,
+        )
+        return record
 
     def save_record(self, sim_time, scheme):
         '''Method to save attack operation into CSV'''
         current_directory = os.getcwd()
         if not os.path.exists(current_directory + "/experimental_data/attack_records"):
             os.makedirs(current_directory + "/experimental_data/attack_records")
-        pd.DataFrame(self._attack_operation_record).to_csv(
+        self.get_record().to_csv(
             "experimental_data/attack_records/attack_operation_record_"
             + str(sim_time)
             + "_"
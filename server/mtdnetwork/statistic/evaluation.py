@@ -49,35 +49,40 @@ class Evaluation:
         record = self._attack_record
         host_num = self.get_network().get_total_nodes()
         result = []
-        comp_nums = {}
-        for comp_ratio in checkpoint:
-            comp_nums[comp_ratio] = host_num * comp_ratio
+        if len(record) == 0:
+            return result
+
+        # the number of compromised hosts never decreases, so the records up to a checkpoint
+        # are a prefix of the record
+        compromised_hosts = record["cumulative_compromised_hosts"].to_numpy()
+        is_attack_action = (
+            record["name"].isin(["SCAN_PORT", "EXPLOIT_VULN", "BRUTE_FORCE"]).to_numpy()
+        )
+        attack_durations = record["duration"].to_numpy()[is_attack_action]
+        attack_action_nums = np.cumsum(is_attack_action)
+        # every port scan on a host counts as an attack event on the host
+        attack_event_nums = np.cumsum(
+            (record["name"] == "SCAN_PORT").to_numpy()
+            & (record["current_host_uuid"] != -1).to_numpy()
+        )
+        mtd_execution_frequency = self.mtd_execution_frequency()
 
-        for comp_ratio, comp_num in comp_nums.items():
-            if max(record["cumulative_compromised_hosts"]) < comp_num:
+        for comp_ratio in checkpoint:
+            comp_num = host_num * comp_ratio
+            if compromised_hosts[-1] < comp_num:
                 break
-            sub_record = record[record["cumulative_compromised_hosts"] <= comp_num]
-            time_to_compromise = sub_record[
-                sub_record["name"].isin(["SCAN_PORT", "EXPLOIT_VULN", "BRUTE_FORCE"])
-            ]["duration"].sum()
-            attempt_hosts = sub_record[sub_record["current_host_uuid"] != -1][
-                "current_host_uuid"
-            ].unique()
-            attack_actions = sub_record[
-                sub_record["name"].isin(["SCAN_PORT", "EXPLOIT_VULN", "BRUTE_FORCE"])
-            ]
-            attack_event_num = 0
-            for host in attempt_hosts:
-                attack_event_num += len(
-                    attack_actions[
-                        (attack_actions["current_host_uuid"] == host)
-                        & (attack_actions["name"] == "SCAN_PORT")
-                    ]
-                )
+            record_num = np.searchsorted(compromised_hosts, comp_num, side="right")
+            if record_num == 0:
+                time_to_compromise = 0.0
+                attack_event_num = 0
+            else:
+                # summed over the same values in the same order as a dataframe sum would
+                time_to_compromise = attack_durations[
+                    : attack_action_nums[record_num - 1]
+                ].sum()
+                attack_event_num = int(attack_event_nums[record_num - 1])
             attack_success_rate = comp_num / attack_event_num
 
-            mtd_execution_frequency = self.mtd_execution_frequency()
-
             result.append(
                 {
                     "time_to_compromise": time_to_compromise,
@@ -1,13 +1,22 @@
 """Module for recording data related to MTD strategies"""
 import os
-import pandas as pd
+import numpy as np
+from mtdnetwork.statistic.record_buffer import RecordBuffer, CATEGORY
 
 
 class MTDStatistics:
     """Class for recording statistics of MTD strategies"""
 
     def __init__(self):
-        self._mtd_operation_record = []
+        self._mtd_operation_record = RecordBuffer(
+            {
+                "name": CATEGORY,
+                "start_time": np.float64,
+                "finish_time": np.float64,
+                "duration": np.float64,
+                "executed_at": CATEGORY,
+            }
+        )
         self._total_suspended = 0
         self._total_triggered = 0
         self._total_executed = 0
@@ -20,13 +29,11 @@ class MTDStatistics:
     ):
         """Method appends data to record"""
         self._mtd_operation_record.append(
-            {
-                "name": mtd_strategy.get_name(),
-                "start_time": start_time,
-                "finish_time": finish_time,
-                "duration": duration,
-                "executed_at": mtd_strategy.get_resource_type(),
-            }
+            name=mtd_strategy.get_name(),
+            start_time=start_time,
+            finish_time=finish_time,
+            duration=duration,
+            executed_at=mtd_strategy.get_resource_type(),
         )
         self._total_executed += 1
 
@@ -62,14 +69,14 @@ class MTDStatistics:
 
     def get_record(self):
         """Method returns mtd record as pandas dataframe"""
-        return pd.DataFrame(self._mtd_operation_record)
+        return self._mtd_operation_record.to_frame()
 
     def save_record(self, sim_time, scheme):
         """Method saves MTD records in csv file"""
         current_directory = os.getcwd()
         if not os.path.exists(current_directory + "/experimental_data/mtd_records"):
             os.makedirs(current_directory + "/experimental_data/mtd_records")
-        pd.DataFrame(self._mtd_operation_record).to_csv(
+        self.get_record().to_csv(
             "experimental_data/mtd_records/mtd_operation_record_"
             + str(sim_time)
             + "_"
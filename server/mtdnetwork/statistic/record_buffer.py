@@ -0,0 +1,76 @@
+"""Module for columnar, append-only buffers of simulation records"""
+import numpy as np
+import pandas as pd
+
+# number of rows allocated before the buffer first grows
+INITIAL_CAPACITY = 1024
+CATEGORY = "category"
+
+
+class RecordBuffer:
+    """Class for recording rows into preallocated, growable column arrays"""
+
+    def __init__(self, columns, capacity=INITIAL_CAPACITY):
+        """
+        Parameters:
+            columns:
+                a dict of column names to the numpy dtype of the column, CATEGORY for
+                values from a small set that are stored as integer codes, or object
+            capacity:
+                the number of rows allocated up front, doubled every time it runs out
+        """
+        self._categories = {
+            name: {} for name, dtype in columns.items() if dtype == CATEGORY
+        }
+        self._arrays = {
+            name: np.empty(
+                capacity, dtype=np.int32 if name in self._categories else dtype
+            )
+            for name, dtype in columns.items()
+        }
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _encode(self, name, value):
+        categories = self._categories[name]
+        code = categories.get(value)
+        if code is None:
+            code = categories[value] = len(categories)
+        return code
+
+    def _grow(self):
+        for name, array in self._arrays.items():
+            grown = np.empty(2 * len(array), dtype=array.dtype)
+            grown[: self._size] = array[: self._size]
+            self._arrays[name] = grown
+
+    def append(self, **values):
+        """Method to append a row, every column must be given a value"""
+        if self._size == len(next(iter(self._arrays.values()))):
+            self._grow()
+        self._size += 1
+        for name, value in values.items():
+            self.set_last(name, value)
+
+    def set_last(self, name, value):
+        """Method to overwrite a column of the most recently appended row"""
+        if name in self._categories:
+            value = self._encode(name, value)
+        self._arrays[name][self._size - 1] = value
+
+    def to_frame(self):
+        """
+        Method returns the rows as a pandas dataframe. pandas may or may not copy the
+        columns, so the buffer should not be changed while the dataframe is in use
+        """
+        data = {}
+        for name, array in self._arrays.items():
+            column = array[: self._size]
+            if name in self._categories:
+                column = pd.Categorical.from_codes(
+                    column, categories=list(self._categories[name])
+                )
+            data[name] = column
+        return pd.DataFrame(data, copy=False)
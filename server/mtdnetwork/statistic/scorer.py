@@ -249,6 +249,8 @@ class Scorer:
         hosts = network.get_hosts()
 
         total_vulns = 0
+        # vulnerabilities are shared between hosts, each is one instance so a set counts them once
+        unique_vulns = set()
 
         host_os_type_and_version_vuln_roa = {}
 
@@ -264,25 +266,17 @@ class Scorer:
             host_vulns = host_instance.get_all_vulns()
 
             total_vulns += len(host_vulns)
+            unique_vulns.update(host_vulns)
 
             if len(host_vulns) == 0:
                 hosts_without_vulns += 1
+                continue
 
-            for vul in host_vulns:
-                roa = vul.initial_roa()
-                if host_os not in host_os_type_and_version_vuln_roa:
-                    host_os_type_and_version_vuln_roa[host_os] = {}
-
-                if vul not in host_os_type_and_version_vuln_roa[host_os].get(
-                    host_version, []
-                ):
-                    host_os_type_and_version_vuln_roa[host_os][
-                        host_version
-                    ] = host_os_type_and_version_vuln_roa[host_os].get(
-                        host_version, []
-                    ) + [
-                        roa
-                    ]
+            # the RoA of every vulnerability on every host is averaged, shared vulnerabilities included
+            roa_list = host_os_type_and_version_vuln_roa.setdefault(
+                host_os, {}
+            ).setdefault(host_version, [])
+            roa_list.extend(vul.initial_roa() for vul in host_vulns)
 
         vulns_per_os = {}
         avg_roa_per_os = {}
@@ -300,7 +294,7 @@ class Scorer:
         self.stats[
             "Total Initial Vulnerabilities (Sum of all Vulns on all hosts)"
         ] = total_vulns
-        self.stats["Total Unique Vulnerabilities"] = len(network.get_vuln_dict())
+        self.stats["Total Unique Vulnerabilities"] = len(unique_vulns)
         self.stats["Initial Vulns Per OS (Sum of all Vulns on those OS)"] = vulns_per_os
         self.stats["Average Initial RoA Per OS"] = avg_roa_per_os
         self.stats["OS Types In Initial Network"] = os_types_in_network
@@ -1,6 +1,8 @@
 import pytest
 import random
 from api import app
+from api.services import simulation
+from mtdnetwork.component.time_generator import VariateStream
 import numpy as np
 
 
@@ -19,3 +21,18 @@ def client(app_fixture):
     random.seed(3200)
     np.random.seed(3200)
     return app_fixture.test_client()
+
+
+@pytest.fixture()
+def variate_seeds(monkeypatch):
+    """
+    Seeds the VariateStream of each unseeded simulation with the next seed appended to
+    the returned list, so the time durations do not depend on the global random states
+    """
+    seeds = []
+
+    def seeded_variate_stream(seed=None):
+        return VariateStream(seed=seeds.pop(0) if seed is None else seed)
+
+    monkeypatch.setattr(simulation, "VariateStream", seeded_variate_stream)
+    return seeds
@@ -0,0 +1,86 @@
+import pytest
+from api.app import result_cache
+from api.services import ResultCache, simulation_cache_key
+
+
+def test_simulate_seeded_result_is_cached(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "scheme": "random",
+        "totalNodes": 50,
+        "seed": 3201,
+    }
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+    # the payload is cached once it has been written out
+    assert len(response.data) > 0
+    assert result_cache.get_total_bytes() > 0
+
+    # host ids are random uuids so an identical response can only come from the cache
+    cached_response = client.post("/simulate", json=req_body)
+    assert cached_response.status_code == 200
+    assert cached_response.data == response.data
+
+    req_body["seed"] = 3202
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+    assert response.data != cached_response.data
+
+
+def test_cache_key_is_canonical():
+    params = {"scheme": "random", "seed": 1, "total_nodes": 50}
+    assert simulation_cache_key(params) == simulation_cache_key(
+        dict(reversed(list(params.items())))
+    )
+    assert simulation_cache_key(params) != simulation_cache_key({**params, "seed": 2})
+    assert simulation_cache_key(params).endswith(".json")
+
+
+def test_cache_key_extension_follows_media_type(tmp_path):
+    pytest.importorskip("msgpack")
+    params = {"scheme": "random", "seed": 1, "total_nodes": 50}
+    key = simulation_cache_key(params, {"media_type": "application/msgpack"})
+    assert key.endswith(".msgpack")
+    ResultCache(directory=tmp_path).put(key, b"1234")
+    assert (tmp_path / key).read_bytes() == b"1234"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.get_total_bytes() == 8
+
+
+def test_cache_disk_tier(tmp_path):
+    ResultCache(directory=tmp_path).put("a", b"1234")
+    cache = ResultCache(directory=tmp_path)
+    assert cache.get("a") == b"1234"
+    assert "a" in cache
+    assert cache.get("b") is None
+
+
+def test_cache_streamed_payloads():
+    cache = ResultCache(max_payload_bytes=8)
+    assert list(cache.put_chunks("a", [b"12", b"34"])) == [b"12", b"34"]
+    assert cache.get("a") == b"1234"
+
+    # payloads above the size cap are streamed but not cached
+    assert list(cache.put_chunks("b", [b"1234", b"5678", b"9"])) == [
+        b"1234",
+        b"5678",
+        b"9",
+    ]
+    assert "b" not in cache
+
+    # a stream that is not read to the end is not cached
+    chunks = cache.put_chunks("c", [b"12", b"34"])
+    next(chunks)
+    chunks.close()
+    assert "c" not in cache
@@ -0,0 +1,45 @@
+import random
+import networkx as nx
+from mtdnetwork.component.time_network import TimeNetwork
+from mtdnetwork.component.graph_backend import CSRGraph, NetworkxGraph
+
+
+def test_csr_graph_matches_networkx_graph():
+    random.seed(3200)
+    network = TimeNetwork(total_nodes=100, headless=True)
+    csr_graph = CSRGraph.from_networkx(network.graph)
+    nx_graph = NetworkxGraph.from_networkx(network.graph)
+
+    for node in network.graph.nodes:
+        assert csr_graph.get_neighbors(node) == nx_graph.get_neighbors(node)
+        assert csr_graph.get_layer(node) == nx_graph.get_layer(node)
+        assert csr_graph.get_subnet(node) == nx_graph.get_subnet(node)
+        assert csr_graph.get_host(node) is nx_graph.get_host(node)
+    assert csr_graph.get_host(-1) is None
+
+    sources = network.get_exposed_endpoints()
+    assert csr_graph.get_distances(sources) == nx_graph.get_distances(sources)
+    nodes = random.sample(list(network.graph.nodes), 60)
+    assert csr_graph.get_distances(sources, nodes=nodes) == nx_graph.get_distances(
+        sources, nodes=nodes
+    )
+
+
+def test_network_distances_follow_the_graph():
+    random.seed(3200)
+    network = TimeNetwork(total_nodes=100, headless=True)
+    sources = network.get_exposed_endpoints()
+    node = max(network.graph.nodes, key=network.get_distance_from_exposed)
+    assert network.get_distance_from_exposed(node) > 2
+
+    # an edge added in place rebuilds the topology
+    network.graph.add_edge(sources[0], node)
+    network.sort_by_distance_from_exposed_and_pivot_host([node], [])
+    assert network.get_distance_from_exposed(node) == 2
+    assert network.topology.get_total_edges() == network.graph.number_of_edges()
+
+    # a graph that is not a subgraph of the network graph is searched on its own edges
+    graph = nx.path_graph(network.graph.nodes)
+    assert network.get_distance_from_exposed(node, graph=graph) == node + 1 - max(
+        s for s in sources if s <= node
+    )
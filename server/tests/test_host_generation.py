@@ -0,0 +1,91 @@
+import random
+import networkx as nx
+import mtdnetwork.component.time_network  # noqa: F401 imports host without a circular import
+from mtdnetwork.component.host import Host
+import mtdnetwork.data.constants as constants
+
+
+def reference_internal_network(total_services, k_nearest_neighbors_percent, p):
+    """
+    The internal network builder before it was optimised, built from all pairs shortest
+    path lengths and by pairing up every two nodes
+    """
+    total_nodes = total_services + 1
+    k = max(int(total_services * k_nearest_neighbors_percent), 2)
+    graph = nx.connected_watts_strogatz_graph(total_nodes, k, p)
+
+    shortest_path_length = dict(nx.all_pairs_shortest_path_length(graph))
+    target_distance = nx.diameter(graph) - 1
+    target_node = -1
+    target_count = -1
+    exposed_endpoints = []
+    for x in graph.nodes:
+        e_endpoints = [
+            y for y in graph.nodes if shortest_path_length[x][y] >= target_distance
+        ]
+        if len(e_endpoints) > target_count:
+            target_node = x
+            target_count = len(e_endpoints)
+            exposed_endpoints = e_endpoints
+    if target_node in exposed_endpoints:
+        exposed_endpoints.remove(target_node)
+
+    other_nodes = [
+        n for n in range(total_nodes) if n != target_node and n not in exposed_endpoints
+    ]
+    for o1_node in other_nodes:
+        if not any(n in exposed_endpoints for n in graph.neighbors(o1_node)):
+            graph.add_edge(o1_node, random.choice(exposed_endpoints))
+        for o2_node in other_nodes:
+            if o1_node == o2_node:
+                continue
+            if graph.has_edge(o1_node, o2_node):
+                graph.remove_edge(o1_node, o2_node)
+            graph.add_edge(o1_node, target_node)
+            graph.add_edge(o2_node, target_node)
+
+    for e1_node in exposed_endpoints:
+        for e2_node in exposed_endpoints:
+            if e1_node == e2_node or not graph.has_edge(e1_node, e2_node):
+                continue
+            graph.remove_edge(e1_node, e2_node)
+            if len(other_nodes) > 0:
+                o1_node = random.choice(other_nodes)
+                o2_node = random.choice(other_nodes)
+                if not graph.has_edge(e1_node, o1_node):
+                    graph.add_edge(e1_node, o1_node)
+                if not graph.has_edge(e2_node, o2_node):
+                    graph.add_edge(e2_node, o2_node)
+            else:
+                if nx.is_isolate(graph, e1_node):
+                    graph.add_edge(e1_node, target_node)
+                if nx.is_isolate(graph, e2_node):
+                    graph.add_edge(e2_node, target_node)
+
+    return graph, target_node, exposed_endpoints
+
+
+def test_internal_network_matches_reference_builder():
+    for seed in range(300):
+        total_services = constants.HOST_SERVICES_MIN + seed % (
+            constants.HOST_SERVICES_MAX - constants.HOST_SERVICES_MIN + 1
+        )
+        random.seed(seed)
+        graph, target_node, exposed_endpoints = reference_internal_network(
+            total_services, 0.5, 0.5
+        )
+        reference_state = random.getstate()
+
+        host = Host.__new__(Host)
+        host.total_services = total_services
+        host.total_nodes = total_services + 1
+        random.seed(seed)
+        host.gen_internal_network(0.5, 0.5)
+
+        assert host.target_node == target_node
+        assert host.exposed_endpoints == exposed_endpoints
+        # the same edges with the same neighbour order, and the same random draws
+        assert {n: list(host.graph.adj[n]) for n in host.graph} == {
+            n: list(graph.adj[n]) for n in graph
+        }
+        assert random.getstate() == reference_state
@@ -0,0 +1,133 @@
+import time
+import pytest
+from api.app import job_manager
+from api.services import JobManager, ShutDownError
+
+
+def wait_for_job(client, job_id, timeout=300):
+    start = time.time()
+    while time.time() - start < timeout:
+        response_data = client.get(f"/jobs/{job_id}").get_json()
+        if response_data["status"] not in ["queued", "running"]:
+            return response_data
+        time.sleep(0.5)
+    raise TimeoutError(f"job {job_id} did not finish")
+
+
+def test_job_result_matches_simulate(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "scheme": "random",
+        "totalNodes": 50,
+        "seed": 3200,
+    }
+    response = client.post("/jobs", json=req_body)
+    assert response.status_code == 202
+    job_id = response.get_json()["id"]
+
+    job = wait_for_job(client, job_id)
+    assert job["status"] == "finished"
+    assert job["progress"] == 1.0
+
+    response = client.delete(f"/jobs/{job_id}")
+    assert response.status_code == 409
+    assert response.get_json()["status"] == "finished"
+
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 200
+    job_result = response.get_json()
+
+    expected = client.post("/simulate", json=req_body).get_json()
+    assert len(job_result["network"]["nodes"]) == len(expected["network"]["nodes"])
+    for link in job_result["network"]["links"]:
+        assert link in expected["network"]["links"]
+    assert (
+        job_result["compromise_checkpoint_metrics"]
+        == expected["compromise_checkpoint_metrics"]
+    )
+
+
+def test_job_does_not_exist(client):
+    response = client.get("/jobs/CITS3200")
+    assert response.status_code == 404
+    assert response.get_json() == {"error": "job CITS3200 does not exist"}
+
+    response = client.get("/jobs/CITS3200/result")
+    assert response.status_code == 404
+
+    response = client.delete("/jobs/CITS3200")
+    assert response.status_code == 404
+
+
+def test_job_scheme_does_not_exist(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "scheme": "CITS3200",
+    }
+    response = client.post("/jobs", json=req_body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "scheme CITS3200 does not exist"}
+
+
+def test_job_queue_full(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+    }
+    max_queue_depth = job_manager.max_queue_depth
+    job_manager.max_queue_depth = 0
+    try:
+        response = client.post("/jobs", json=req_body)
+    finally:
+        job_manager.max_queue_depth = max_queue_depth
+    assert response.status_code == 503
+
+
+def test_job_result_is_transcoded_once(client):
+    msgpack = pytest.importorskip("msgpack")
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "seed": 3200,
+    }
+    job_id = client.post("/jobs", json=req_body).get_json()["id"]
+    assert wait_for_job(client, job_id)["status"] == "finished"
+
+    response = client.get(
+        f"/jobs/{job_id}/result", headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/msgpack"
+    job_result = client.get(f"/jobs/{job_id}/result").get_json()
+    assert (
+        msgpack.unpackb(response.data, strict_map_key=False)[
+            "compromise_checkpoint_metrics"
+        ]
+        == job_result["compromise_checkpoint_metrics"]
+    )
+    assert job_manager.get_result(
+        job_id, "application/msgpack"
+    ) is job_manager.get_result(job_id, "application/msgpack")
+
+
+def test_running_job_without_finish_time_cannot_be_cancelled():
+    manager = JobManager(max_workers=1)
+    try:
+        job_id = manager.submit({"mtd_interval": 200, "total_nodes": 200, "seed": 3200})
+        while manager.get_status(job_id) == "queued":
+            time.sleep(0.05)
+        assert not manager.cancel(job_id)
+        manager.get_result(job_id)
+        assert manager.get_status(job_id) == "finished"
+    finally:
+        manager.shutdown()
+
+    with pytest.raises(ShutDownError):
+        manager.get_status(job_id)
+    with pytest.raises(ShutDownError):
+        manager.submit({"mtd_interval": 200, "total_nodes": 50})
@@ -0,0 +1,24 @@
+import numpy as np
+from mtdnetwork.statistic.record_buffer import RecordBuffer, CATEGORY
+
+
+def test_record_buffer_grows_and_encodes_categories():
+    buffer = RecordBuffer(
+        {"name": CATEGORY, "time": np.float64, "host": object}, capacity=2
+    )
+    for i in range(5):
+        buffer.append(name=["SCAN_HOST", "SCAN_PORT"][i % 2], time=i / 2, host="None")
+    buffer.set_last("host", 3)
+
+    record = buffer.to_frame()
+    assert len(record) == 5
+    assert record["name"].dtype == "category"
+    assert list(record["name"]) == ["SCAN_HOST", "SCAN_PORT"] * 2 + ["SCAN_HOST"]
+    assert list(record["time"]) == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert list(record["host"]) == ["None"] * 4 + [3]
+
+
+def test_empty_record_buffer_keeps_columns():
+    record = RecordBuffer({"name": CATEGORY, "time": np.float64}).to_frame()
+    assert len(record) == 0
+    assert list(record.columns) == ["name", "time"]
@@ -0,0 +1,42 @@
+import random
+import mtdnetwork.data.constants as constants
+from mtdnetwork.component.services import ServicesGenerator
+
+
+def test_exploit_only_updates_services_with_the_vulnerability():
+    random.seed(3200)
+    generator = ServicesGenerator()
+    services = [
+        service.copy()
+        for versions in generator.services.values()
+        for service in versions
+    ]
+    unexploited = {id(service): service.get_unexploited_vulns() for service in services}
+
+    vuln = services[0].get_vulns()[0]
+    vuln.exploited = True
+
+    for service in services:
+        if vuln in service.get_all_vulns():
+            assert service.get_unexploited_vulns() == [
+                v for v in unexploited[id(service)] if v is not vuln
+            ]
+        else:
+            assert service.get_unexploited_vulns() is unexploited[id(service)]
+
+
+def test_exploit_value_sums_exploited_impact():
+    random.seed(3200)
+    generator = ServicesGenerator()
+    service = generator.services[generator.service_names[0]][0].copy()
+    copy = service.copy()
+    assert not service.is_exploited()
+    assert service.exploit_value == 0
+
+    for vuln in service.get_all_vulns():
+        vuln.exploited = True
+    assert copy.is_exploited() == (
+        copy.exploit_value > constants.SERVICE_COMPROMISED_THRESHOLD
+    )
+    assert copy.exploit_value == sum(v.impact for v in service.get_all_vulns())
+    assert copy.get_unexploited_vulns() == []
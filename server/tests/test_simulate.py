@@ -1,4 +1,15 @@
+import gzip
 import json
+import pytest
+
+# seeds of the random time durations the fixtures in tests/data were generated with
+VARIATE_SEED = 168057583
+SINGLE_STRATEGY_VARIATE_SEEDS = {
+    "IP Shuffle": VARIATE_SEED,
+    "OS Diversity": 62525976,
+    "Service Diversity": 51058555,
+    "Complete Topology Shuffle": 1519811421,
+}
 
 
 def assert_response_equals_expected(response, expected):
@@ -17,7 +28,8 @@ def assert_response_equals_expected(response, expected):
     #     assert node in expected["network"]["nodes"]
 
 
-def test_mtd_simulation_none(client):
+def test_mtd_simulation_none(client, variate_seeds):
+    variate_seeds.append(VARIATE_SEED)
     req_body = {
         "finishTime": 3000,
         "mtdInterval": 200,
@@ -35,7 +47,8 @@ def test_mtd_simulation_none(client):
     assert_response_equals_expected(response_data, expected_response)
 
 
-def test_mtd_simulation_random(client):
+def test_mtd_simulation_random(client, variate_seeds):
+    variate_seeds.append(VARIATE_SEED)
     req_body = {
         "finishTime": 3000,
         "mtdInterval": 200,
@@ -54,7 +67,7 @@ def test_mtd_simulation_random(client):
     assert_response_equals_expected(response_data, expected_response)
 
 
-def test_mtd_simulation_single(client):
+def test_mtd_simulation_single(client, variate_seeds):
     req_body = {
         "finishTime": 3000,
         "mtdInterval": 200,
@@ -68,6 +81,7 @@ def test_mtd_simulation_single(client):
         "Complete Topology Shuffle",
     ]
     for strategy in strategies:
+        variate_seeds.append(SINGLE_STRATEGY_VARIATE_SEEDS[strategy])
         req_body["strategies"] = [strategy]
 
         response = client.post("/simulate", json=req_body)
@@ -84,7 +98,8 @@ def test_mtd_simulation_single(client):
         assert_response_equals_expected(response_data, expected_response)
 
 
-def test_mtd_simulation_alternative(client):
+def test_mtd_simulation_alternative(client, variate_seeds):
+    variate_seeds.append(VARIATE_SEED)
     req_body = {
         "finishTime": 3000,
         "mtdInterval": 200,
@@ -105,7 +120,8 @@ def test_mtd_simulation_alternative(client):
     assert_response_equals_expected(response_data, expected_response)
 
 
-def test_mtd_simulation_simulatneous(client):
+def test_mtd_simulation_simulatneous(client, variate_seeds):
+    variate_seeds.append(VARIATE_SEED)
     req_body = {
         "finishTime": 3000,
         "mtdInterval": 200,
@@ -191,3 +207,121 @@ def test_strategy_not_specified(client):
     response = client.post("/simulate", json=req_body)
     assert response.status_code == 400
     assert response.get_json() == {"error": "MTD strategy not specified"}
+
+
+def test_services_are_referenced_from_tables(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "scheme": "random",
+        "totalNodes": 50,
+    }
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+
+    response_data = response.get_json()
+    service_versions = response_data["service_versions"]
+    vulnerabilities = response_data["vulnerabilities"]
+    total_services = 0
+    for node in response_data["network"]["nodes"]:
+        for service_node in node["host"]["graph"]["nodes"]:
+            if service_node.get("service"):
+                total_services += 1
+                version = service_versions[service_node["service"]["serviceVersion"]]
+                for vuln_id in version["vulnerabilities"]:
+                    assert vulnerabilities[vuln_id]["id"] == vuln_id
+    # every service version is only sent once
+    assert 0 < len(service_versions) < total_services
+
+
+def test_simulation_payload_sections(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "include": ["compromise_checkpoint_metrics", "mtd_record"],
+    }
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+    assert set(response.get_json()) == {"mtd_record", "compromise_checkpoint_metrics"}
+
+    req_body["include"] = ["network"]
+    req_body["detail"] = "summary"
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+    network = response.get_json()["network"]
+    assert len(network["nodes"]) == 50
+    assert all("host" not in node for node in network["nodes"])
+
+    req_body["detail"] = "hosts"
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 200
+    response_data = response.get_json()
+    assert set(response_data) == {"network"}
+    for node in response_data["network"]["nodes"]:
+        assert "hostId" in node["host"]
+        assert "graph" not in node["host"]
+
+
+def test_simulation_payload_section_does_not_exist(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "include": ["network", "CITS3200"],
+    }
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Section 'CITS3200' does not exist"}
+
+    del req_body["include"]
+    req_body["detail"] = "CITS3200"
+    response = client.post("/simulate", json=req_body)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "detail CITS3200 does not exist"}
+
+
+def test_simulation_compressed_response(client):
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "include": ["network", "compromise_checkpoint_metrics"],
+    }
+    response = client.post(
+        "/simulate", json=req_body, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+
+    response_data = json.loads(gzip.decompress(response.data))
+    assert set(response_data) == {
+        "network",
+        "service_versions",
+        "vulnerabilities",
+        "compromise_checkpoint_metrics",
+    }
+    assert len(response_data["network"]["nodes"]) == 50
+
+
+def test_simulation_msgpack_response(client):
+    msgpack = pytest.importorskip("msgpack")
+    req_body = {
+        "finishTime": 3000,
+        "mtdInterval": 200,
+        "totalNodes": 50,
+        "seed": 3200,
+    }
+    response = client.post(
+        "/simulate", json=req_body, headers={"Accept": "application/msgpack"}
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/msgpack"
+    response_data = msgpack.unpackb(response.data, strict_map_key=False)
+
+    expected = client.post("/simulate", json=req_body).get_json()
+    assert response_data["compromise_checkpoint_metrics"] == (
+        expected["compromise_checkpoint_metrics"]
+    )
+    assert response_data["network"]["links"] == expected["network"]["links"]
+    assert response_data["attack_record"]["name"] == expected["attack_record"]["name"]